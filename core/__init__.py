@@ -0,0 +1,7 @@
+"""
+Shared, Streamlit-free building blocks used by the pages in pages/
+(core.ui holds the few Streamlit helpers the pages share).
+
+Streamlit adds the directory of main.py to sys.path, so every page can
+simply do ``from core.price_store import load_ohlcv``.
+"""
@@ -0,0 +1,223 @@
+"""
+Vectorized Black-Scholes engine
+-------------------------------
+Prices and greeks for a whole option chain (or any broadcastable grid of
+strikes, volatilities and maturities) in one NumPy call.
+
+Units:
+- sigma, r and q are annual decimals (0.25 = 25%).
+- T is in years.
+- vega and rho are per 1.00 change in sigma / r, theta is per year.
+
+Inputs that cannot be priced (NaN, sigma <= 0, S <= 0, K <= 0, T <= 0)
+produce NaN in every output instead of raising or warning.
+
+implied_volatility inverts the price for a whole chain at once with a
+safeguarded Newton iteration: every element keeps its own [low, high]
+bracket and falls back to bisection when the Newton step leaves it.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from scipy.stats import norm
+
+
+GREEK_NAMES = ["price", "delta", "gamma", "vega", "theta", "rho", "p_otm"]
+
+
+def is_call_mask(option_type) -> np.ndarray:
+    """
+    "call"/"put" (any case), or an array of them, to a boolean array.
+    """
+    return np.char.lower(np.asarray(option_type, dtype=str)) == "call"
+
+
+def bs_greeks(S, K, T, r, sigma, option_type="call", q=0.0) -> dict[str, np.ndarray]:
+    """
+    Black-Scholes price, delta, gamma, vega, theta, rho and probability of
+    expiring out of the money.
+
+    Every argument may be a scalar or an array; they are broadcast together
+    and every output has the broadcast shape.
+    """
+    S, K, T, r, sigma, q, is_call = np.broadcast_arrays(
+        np.asarray(S, dtype=float),
+        np.asarray(K, dtype=float),
+        np.asarray(T, dtype=float),
+        np.asarray(r, dtype=float),
+        np.asarray(sigma, dtype=float),
+        np.asarray(q, dtype=float),
+        is_call_mask(option_type),
+    )
+
+    valid = (
+        np.isfinite(S) & np.isfinite(K) & np.isfinite(T) &
+        np.isfinite(r) & np.isfinite(sigma) & np.isfinite(q) &
+        (S > 0) & (K > 0) & (T > 0) & (sigma > 0)
+    )
+
+    # Swap invalid inputs for harmless values, then mask the outputs.
+    S_ = np.where(valid, S, 1.0)
+    K_ = np.where(valid, K, 1.0)
+    T_ = np.where(valid, T, 1.0)
+    sigma_ = np.where(valid, sigma, 1.0)
+
+    sqrt_T = np.sqrt(T_)
+    sigma_sqrt_T = sigma_ * sqrt_T
+
+    d1 = (np.log(S_ / K_) + (r - q + 0.5 * sigma_**2) * T_) / sigma_sqrt_T
+    d2 = d1 - sigma_sqrt_T
+
+    disc_r = np.exp(-r * T_)
+    disc_q = np.exp(-q * T_)
+
+    N_d1 = norm.cdf(d1)
+    N_d2 = norm.cdf(d2)
+    N_neg_d1 = 1.0 - N_d1
+    N_neg_d2 = 1.0 - N_d2
+    pdf_d1 = norm.pdf(d1)
+
+    call_price = S_ * disc_q * N_d1 - K_ * disc_r * N_d2
+    put_price = K_ * disc_r * N_neg_d2 - S_ * disc_q * N_neg_d1
+
+    time_decay = -S_ * disc_q * pdf_d1 * sigma_ / (2 * sqrt_T)
+    call_theta = time_decay - r * K_ * disc_r * N_d2 + q * S_ * disc_q * N_d1
+    put_theta = time_decay + r * K_ * disc_r * N_neg_d2 - q * S_ * disc_q * N_neg_d1
+
+    out = {
+        "price": np.where(is_call, call_price, put_price),
+        "delta": np.where(is_call, disc_q * N_d1, disc_q * (N_d1 - 1.0)),
+        "gamma": disc_q * pdf_d1 / (S_ * sigma_sqrt_T),
+        "vega": S_ * disc_q * pdf_d1 * sqrt_T,
+        "theta": np.where(is_call, call_theta, put_theta),
+        "rho": np.where(is_call, K_ * T_ * disc_r * N_d2, -K_ * T_ * disc_r * N_neg_d2),
+        "p_otm": np.where(is_call, N_neg_d2, N_d2),
+    }
+
+    return {name: np.where(valid, values, np.nan) for name, values in out.items()}
+
+
+def bs_price(S, K, T, r, sigma, option_type="call", q=0.0) -> np.ndarray:
+    return bs_greeks(S, K, T, r, sigma, option_type, q)["price"]
+
+
+def _price_and_vega(S, K, T, r, sigma, q, is_call):
+    """
+    Price and vega only, for already-validated 1-D inputs.
+    """
+    sqrt_T = np.sqrt(T)
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma**2) * T) / (sigma * sqrt_T)
+    d2 = d1 - sigma * sqrt_T
+
+    disc_r = np.exp(-r * T)
+    disc_q = np.exp(-q * T)
+
+    call_price = S * disc_q * norm.cdf(d1) - K * disc_r * norm.cdf(d2)
+    put_price = call_price - S * disc_q + K * disc_r
+
+    price = np.where(is_call, call_price, put_price)
+    vega = S * disc_q * norm.pdf(d1) * sqrt_T
+    return price, vega
+
+
+def implied_volatility(
+    price,
+    S,
+    K,
+    T,
+    r,
+    option_type="call",
+    q=0.0,
+    tol: float = 1e-8,
+    max_iter: int = 100,
+    sigma_low: float = 1e-4,
+    sigma_high: float = 5.0,
+) -> np.ndarray:
+    """
+    Black-Scholes implied volatility for every element of price.
+
+    NaN is returned where the price is missing, outside the no-arbitrage
+    bounds, needs a volatility outside [sigma_low, sigma_high], or did not
+    converge to within tol (in price units) after max_iter steps.
+    """
+    price, S, K, T, r, q, is_call = np.broadcast_arrays(
+        np.asarray(price, dtype=float),
+        np.asarray(S, dtype=float),
+        np.asarray(K, dtype=float),
+        np.asarray(T, dtype=float),
+        np.asarray(r, dtype=float),
+        np.asarray(q, dtype=float),
+        is_call_mask(option_type),
+    )
+    shape = price.shape
+    price, S, K, T, r, q, is_call = (
+        a.ravel() for a in (price, S, K, T, r, q, is_call)
+    )
+
+    result = np.full(price.shape, np.nan)
+
+    with np.errstate(all="ignore"):
+        forward_S = S * np.exp(-q * T)
+        discounted_K = K * np.exp(-r * T)
+        lower_bound = np.where(
+            is_call,
+            np.maximum(forward_S - discounted_K, 0.0),
+            np.maximum(discounted_K - forward_S, 0.0),
+        )
+        upper_bound = np.where(is_call, forward_S, discounted_K)
+
+    valid = (
+        np.isfinite(price) & np.isfinite(S) & np.isfinite(K) &
+        np.isfinite(T) & np.isfinite(r) & np.isfinite(q) &
+        (S > 0) & (K > 0) & (T > 0) &
+        (price > lower_bound) & (price < upper_bound)
+    )
+
+    # Solve only the valid elements, on compressed 1-D copies.
+    idx = np.flatnonzero(valid)
+    target, S, K, T, r, q, is_call = (
+        a[idx] for a in (price, S, K, T, r, q, is_call)
+    )
+
+    low = np.full(idx.shape, sigma_low)
+    high = np.full(idx.shape, sigma_high)
+
+    # Brenner-Subrahmanyam at-the-money approximation as the first guess.
+    sigma = np.clip(np.sqrt(2 * np.pi / T) * target / S, sigma_low, sigma_high)
+    converged = np.zeros(idx.shape, dtype=bool)
+
+    # Prices outside the bracket have no solution in [sigma_low, sigma_high].
+    price_low, _ = _price_and_vega(S, K, T, r, low, q, is_call)
+    price_high, _ = _price_and_vega(S, K, T, r, high, q, is_call)
+    active = (price_low <= target) & (target <= price_high)
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+
+        a = np.flatnonzero(active)
+        model, vega = _price_and_vega(S[a], K[a], T[a], r[a], sigma[a], q[a], is_call[a])
+        diff = model - target[a]
+
+        done = np.abs(diff) < tol
+        converged[a[done]] = True
+
+        # Shrink each bracket around the root.
+        high[a] = np.where(diff > 0, sigma[a], high[a])
+        low[a] = np.where(diff < 0, sigma[a], low[a])
+
+        with np.errstate(all="ignore"):
+            newton = sigma[a] - diff / vega
+
+        inside = np.isfinite(newton) & (newton > low[a]) & (newton < high[a])
+        next_sigma = np.where(inside, newton, 0.5 * (low[a] + high[a]))
+
+        sigma[a] = np.where(done, sigma[a], next_sigma)
+
+        bracket_closed = (high[a] - low[a]) < 1e-10
+        converged[a[bracket_closed & ~done]] = True
+        active[a[done | bracket_closed]] = False
+
+    result[idx[converged]] = sigma[converged]
+    return result.reshape(shape)
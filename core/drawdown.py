@@ -0,0 +1,377 @@
+"""
+Drawdown hit probabilities
+--------------------------
+For each start day t and horizon h, the drawdown is
+min(Low[t+1..t+h]) / base[t] - 1, and the hit probability for a threshold
+X is the share of start days whose drawdown is <= -X.
+
+- forward_window_minima: min(Low[t+1..t+h]) for every t and every
+  requested horizon from one sparse table (range-minimum structure):
+  level j holds the minimum of 2^j consecutive lows, and any window is
+  the minimum of two overlapping power-of-two blocks. Building is
+  O(n log H), each horizon is then O(n).
+- Windows that run past the last bar are NaN and are not counted.
+- hit_probabilities: each horizon's drawdowns are sorted once and every
+  threshold is a searchsorted lookup into that empirical CDF, so a curve
+  of hundreds of thresholds costs about one sort per horizon.
+- bootstrap_hit_probabilities: confidence bands from a stationary
+  (random block length) bootstrap of start days. All B replicates are one
+  (B, n) index array, turned into per-replicate start-day counts, and
+  every (horizon, threshold) cell of every replicate then comes out of a
+  single matrix product with the hit indicators of the drawdown array.
+- first_breach_days / survival_curves: days until the future Low first
+  crosses base[t] * (1 - X) for every start day, found by descending the
+  same sparse table (binary lifting: skip every power-of-two block whose
+  minimum stays above the level), O(n log n) per threshold and one pass
+  for all horizons. Start days with no breach before the data ends are
+  censored, and a Kaplan-Meier estimate turns the durations into a
+  survival curve per threshold.
+- drawdown_cube: the horizon x threshold table for a whole watchlist as
+  one long (ticker, horizon, threshold) frame, one ticker per task on a
+  process pool.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from core.parallel import process_pool
+
+
+BASE_MODES = ["(High + Low) / 2", "Close", "Low + alpha*(High-Low)"]
+
+BOOTSTRAP_REPLICATES = 1000
+BOOTSTRAP_BLOCK = 30
+BOOTSTRAP_CONFIDENCE = 0.90
+
+# Replicates drawn per batch; bounds the (replicates, n) index arrays.
+BOOTSTRAP_CHUNK = 200
+
+SURVIVAL_DAYS = 250
+
+# 0.5% to 50% in 0.1% steps
+CURVE_THRESHOLDS = np.round(np.arange(5, 501) / 1000.0, 3)
+
+
+def base_price(high, low, close, base_mode: str, alpha: float = 0.5):
+    if base_mode == "(High + Low) / 2":
+        return (high + low) * 0.5
+    if base_mode == "Close":
+        return close
+    # Low + alpha*(High-Low)
+    return low + alpha * (high - low)
+
+
+def sparse_table(values: np.ndarray, max_window: int) -> list[np.ndarray]:
+    """
+    Level j: minimum of values[i .. i + 2^j - 1] for every valid i.
+    """
+    levels = [np.asarray(values, dtype=float)]
+    width = 1
+
+    while 2 * width <= max_window and len(levels[-1]) > width:
+        prev = levels[-1]
+        levels.append(np.minimum(prev[:-width], prev[width:]))
+        width *= 2
+
+    return levels
+
+
+def forward_window_minima(low, horizons) -> np.ndarray:
+    """
+    (len(horizons), n) array: row i, column t is min(low[t+1 .. t+h_i]),
+    NaN where the window runs past the end of the data.
+    """
+    low = np.asarray(low, dtype=float)
+    horizons = np.asarray(horizons, dtype=int)
+    n = len(low)
+
+    minima = np.full((len(horizons), n), np.nan)
+    if n < 2 or len(horizons) == 0:
+        return minima
+
+    levels = sparse_table(low, int(horizons.max()))
+
+    for i, h in enumerate(horizons):
+        count = n - h  # start days with a full window
+        if h < 1 or count <= 0:
+            continue
+
+        k = int(np.log2(h))
+        width = 1 << k
+        level = levels[k]
+
+        # Window [t+1, t+h] = block starting at t+1 and block ending at t+h.
+        left = level[1:1 + count]
+        right = level[h - width + 1:h - width + 1 + count]
+        minima[i, :count] = np.minimum(left, right)
+
+    return minima
+
+
+def drawdowns(low, base, horizons) -> np.ndarray:
+    """
+    (len(horizons), n) forward drawdowns min(Low[t+1..t+h]) / base[t] - 1,
+    NaN where the window is incomplete or the base is missing.
+    """
+    base = np.asarray(base, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return forward_window_minima(low, horizons) / base[None, :] - 1.0
+
+
+def hit_probabilities(drawdown: np.ndarray, thresholds) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Percentage of valid start days with drawdown <= -threshold, as a
+    (horizons, thresholds) array, and the number of valid start days per
+    horizon.
+    """
+    thresholds = np.asarray(thresholds, dtype=float)
+    drawdown = np.atleast_2d(drawdown)
+
+    probabilities = np.full((len(drawdown), len(thresholds)), np.nan)
+    counts = np.zeros(len(drawdown), dtype=np.int64)
+
+    for i, row in enumerate(drawdown):
+        values = np.sort(row[~np.isnan(row)])
+        counts[i] = len(values)
+
+        if counts[i]:
+            # Number of drawdowns <= -threshold, for every threshold at once
+            hits = np.searchsorted(values, -thresholds, side="right")
+            probabilities[i] = hits / counts[i] * 100.0
+
+    return probabilities, counts
+
+
+def stationary_bootstrap_indices(
+    n: int,
+    n_replicates: int,
+    mean_block: float,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """
+    (n_replicates, n) start-day indices of a stationary bootstrap: blocks
+    start at uniform random days, have geometric lengths with mean
+    mean_block, and wrap around the end of the sample.
+    """
+    positions = np.arange(n)
+
+    new_block = rng.random((n_replicates, n)) < 1.0 / max(mean_block, 1.0)
+    new_block[:, 0] = True
+    block_starts = rng.integers(0, n, size=(n_replicates, n))
+
+    # Column where the current block began, and how far into it we are.
+    opened = np.maximum.accumulate(np.where(new_block, positions, 0), axis=1)
+    first = np.take_along_axis(block_starts, opened, axis=1)
+
+    return (first + positions - opened) % n
+
+
+def bootstrap_hit_probabilities(
+    drawdown: np.ndarray,
+    thresholds,
+    n_replicates: int = BOOTSTRAP_REPLICATES,
+    mean_block: float = BOOTSTRAP_BLOCK,
+    confidence: float = BOOTSTRAP_CONFIDENCE,
+    seed: int | None = None,
+    chunk_size: int = BOOTSTRAP_CHUNK,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Lower and upper percentile bands (%) of the hit probability for every
+    (horizon, threshold) cell, as two (horizons, thresholds) arrays.
+
+    Start days are resampled jointly for all horizons; a replicate's
+    estimate for a horizon only uses the sampled days with a full window.
+    Replicates are drawn chunk_size at a time.
+    """
+    thresholds = np.asarray(thresholds, dtype=float)
+    drawdown = np.atleast_2d(drawdown)
+    n_horizons, n = drawdown.shape
+    n_thresholds = len(thresholds)
+
+    # Columns per horizon: one hit indicator per threshold, then validity.
+    valid = ~np.isnan(drawdown)
+    hits = drawdown[:, :, None] <= -thresholds[None, None, :]
+    indicators = np.concatenate([hits, valid[:, :, None]], axis=2)
+    indicators = indicators.transpose(1, 0, 2).reshape(n, -1).astype(np.float32)
+
+    rng = np.random.default_rng(seed)
+    totals = np.empty((n_replicates, indicators.shape[1]), dtype=np.float32)
+
+    for start in range(0, n_replicates, chunk_size):
+        count = min(chunk_size, n_replicates - start)
+        indices = stationary_bootstrap_indices(n, count, mean_block, rng)
+
+        # How often each start day appears in each replicate.
+        rows = np.repeat(np.arange(count), n)
+        weights = np.bincount(rows * n + indices.ravel(), minlength=count * n)
+        weights = weights.reshape(count, n).astype(np.float32)
+
+        totals[start:start + count] = weights @ indicators
+
+    totals = totals.reshape(n_replicates, n_horizons, n_thresholds + 1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        replicates = totals[:, :, :-1] / totals[:, :, -1:] * 100.0
+
+    tail = (1.0 - confidence) / 2.0 * 100.0
+    low, high = np.nanpercentile(replicates, [tail, 100.0 - tail], axis=0)
+    return low, high
+
+
+def first_breach_days(low, base, thresholds) -> np.ndarray:
+    """
+    (len(thresholds), n) array: number of days after t until the first
+    Low[t+k] <= base[t] * (1 - threshold), NaN if it never happens before
+    the end of the data (or base[t] is missing).
+    """
+    low = np.asarray(low, dtype=float)
+    base = np.asarray(base, dtype=float)
+    thresholds = np.asarray(thresholds, dtype=float)
+    n = len(low)
+
+    days = np.full((len(thresholds), n), np.nan)
+    if n < 2:
+        return days
+
+    levels = sparse_table(low, n)
+    start = np.arange(n)
+
+    for i, thr in enumerate(thresholds):
+        level_price = base * (1.0 - thr)
+        position = start + 1
+
+        # Largest blocks first: skip a block when its minimum stays above
+        # the level, so position ends on the first breach (or past the end).
+        for k in range(len(levels) - 1, -1, -1):
+            width = 1 << k
+            block = levels[k]
+            fits = position + width <= n
+            block_min = block[np.minimum(position, len(block) - 1)]
+            position = np.where(fits & (block_min > level_price), position + width, position)
+
+        breached = position < n
+        breached[breached] = low[position[breached]] <= level_price[breached]
+        days[i, breached] = (position - start)[breached]
+
+    return days
+
+
+def kaplan_meier(durations, observed, max_days: int = SURVIVAL_DAYS) -> np.ndarray:
+    """
+    Kaplan-Meier survival S(1..max_days) from integer durations; entries
+    with observed False are censored at their duration.
+    """
+    durations = np.asarray(durations, dtype=np.int64)
+    observed = np.asarray(observed, dtype=bool)
+
+    horizon = max(max_days, int(durations.max(initial=0))) + 1
+    events = np.bincount(durations[observed], minlength=horizon)
+    exits = np.bincount(durations, minlength=horizon)
+
+    # At risk on day d: every entry whose duration is at least d.
+    at_risk = exits[::-1].cumsum()[::-1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hazard = np.where(at_risk > 0, events / at_risk, 0.0)
+
+    return np.cumprod(1.0 - hazard[1:max_days + 1])
+
+
+def survival_curves(low, base, thresholds, max_days: int = SURVIVAL_DAYS) -> pd.DataFrame:
+    """
+    Probability that the future Low has not yet crossed base * (1 - X)
+    after 1..max_days trading days, one column per threshold. Start days
+    whose breach would fall after the end of the data are censored at the
+    number of days they were observed.
+    """
+    low = np.asarray(low, dtype=float)
+    base = np.asarray(base, dtype=float)
+    n = len(low)
+
+    breach = first_breach_days(low, base, thresholds)
+    observed_days = n - 1 - np.arange(n)
+    usable = ~np.isnan(base)
+
+    curves = {}
+    for thr, days in zip(thresholds, breach):
+        hit = ~np.isnan(days)
+        durations = np.where(hit, days, observed_days)[usable]
+        curves[thr] = kaplan_meier(durations.astype(np.int64), hit[usable], max_days)
+
+    return pd.DataFrame(curves, index=pd.RangeIndex(1, max_days + 1, name="day"))
+
+
+def drawdown_table(
+    high,
+    low,
+    close,
+    horizons,
+    thresholds,
+    base_mode: str,
+    alpha: float = 0.5,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Hit probabilities (%) as a (horizons, thresholds) array and the number
+    of windows per horizon, for one ticker's aligned High/Low/Close.
+    """
+    base = base_price(np.asarray(high, dtype=float), np.asarray(low, dtype=float),
+                      np.asarray(close, dtype=float), base_mode, alpha)
+    return hit_probabilities(drawdowns(low, base, horizons), thresholds)
+
+
+def frame_table(df: pd.DataFrame, horizons, thresholds, base_mode: str, alpha: float = 0.5):
+    """
+    drawdown_table for a flat OHLC frame (price store layout).
+    """
+    bars = df[["High", "Low", "Close"]].dropna().astype(float)
+    return drawdown_table(bars["High"], bars["Low"], bars["Close"],
+                          horizons, thresholds, base_mode, alpha)
+
+
+def drawdown_cube(
+    frames: dict[str, pd.DataFrame],
+    horizons,
+    thresholds,
+    base_mode: str,
+    alpha: float = 0.5,
+    workers: int = 1,
+) -> pd.DataFrame:
+    """
+    Long table indexed by (ticker, horizon, threshold) with columns
+    hit_probability (%) and windows. Tickers keep the order of frames.
+    """
+    tickers = [ticker for ticker, df in frames.items() if not df.empty]
+    horizons = [int(h) for h in horizons]
+    thresholds = [float(x) for x in thresholds]
+    n = len(tickers)
+
+    if workers <= 1 or n < 2:
+        tables = [frame_table(frames[t], horizons, thresholds, base_mode, alpha) for t in tickers]
+    else:
+        with process_pool(min(workers, n)) as pool:
+            tables = list(pool.map(
+                frame_table,
+                [frames[t] for t in tickers],
+                [horizons] * n,
+                [thresholds] * n,
+                [base_mode] * n,
+                [alpha] * n,
+            ))
+
+    index = pd.MultiIndex.from_product(
+        [tickers, horizons, thresholds],
+        names=["ticker", "horizon", "threshold"],
+    )
+
+    if not tickers:
+        return pd.DataFrame({"hit_probability": [], "windows": []}, index=index)
+
+    probabilities = np.stack([table[0] for table in tables])
+    windows = np.stack([table[1] for table in tables])
+
+    return pd.DataFrame({
+        "hit_probability": probabilities.ravel(),
+        "windows": np.repeat(windows, len(thresholds), axis=1).ravel().astype(np.int64),
+    }, index=index)
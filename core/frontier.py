@@ -0,0 +1,420 @@
+"""
+Efficient frontier
+------------------
+Portfolio statistics for the Efficient Frontier page.
+
+- simulate_portfolios: random long-only portfolios in large batches. The
+  weights are a preallocated float32 (portfolios x tickers) array filled
+  with Dirichlet draws; returns are one matmul and variances one einsum
+  per batch, so a million portfolios take about a second.
+- min_variance_weights / tangency_weights: the analytic (short sales
+  allowed) minimum-variance and tangency portfolios.
+- long_only_min_variance / long_only_max_sharpe / efficient_frontier:
+  exact long-only portfolios from a small primal active-set QP solver.
+  The frontier is traced over a grid of target returns, each solve
+  warm-started from the previous point.
+- bin_cloud: the simulated (volatility, return) cloud aggregated onto a
+  2D grid (max Sharpe per cell) plus its upper envelope, so drawing it
+  costs the same for 10k or 1M portfolios.
+- walk_forward_backtest: monthly rebalancing to the long-only max Sharpe
+  portfolio of a trailing window. Window sums and cross-products are
+  updated incrementally from one rebalance date to the next (only the
+  rows entering and leaving the window are touched), and the independent
+  QP solves run on a process pool.
+
+annual_returns and cov_matrix are the annualized mean daily returns and
+covariance used by the page (x 252).
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from core.parallel import process_pool
+
+
+PORTFOLIO_BATCH = 100_000
+FRONTIER_POINTS = 50
+CLOUD_BINS = 300
+TRADING_DAYS = 252
+
+
+def portfolio_stats(weights: np.ndarray, annual_returns, cov_matrix, risk_free_rate: float):
+    """
+    Return, volatility and Sharpe ratio of every row of weights.
+    A zero-volatility portfolio gets a Sharpe ratio of 0.
+    """
+    mu = np.asarray(annual_returns, dtype=float)
+    cov = np.asarray(cov_matrix, dtype=float)
+    weights = np.atleast_2d(weights).astype(float, copy=False)
+
+    ret = weights @ mu
+    var = np.einsum("ij,ij->i", weights @ cov, weights)
+    vol = np.sqrt(np.maximum(var, 0.0))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(vol > 0, (ret - risk_free_rate) / vol, 0.0)
+
+    return ret, vol, sharpe
+
+
+def simulate_portfolios(
+    annual_returns,
+    cov_matrix,
+    num_portfolios: int,
+    risk_free_rate: float,
+    alpha: float = 1.0,
+    batch_size: int = PORTFOLIO_BATCH,
+    seed=None,
+) -> tuple[pd.DataFrame, np.ndarray]:
+    """
+    Random long-only portfolios with Dirichlet(alpha) weights
+    (alpha = 1: uniform over all fully invested portfolios).
+
+    Returns a DataFrame with Volatility, Return and Sharpe Ratio columns
+    and the float32 weight array, row i belonging to result row i.
+    """
+    rng = np.random.default_rng(seed)
+    n_assets = len(annual_returns)
+
+    weights = np.empty((num_portfolios, n_assets), dtype=np.float32)
+    results = np.empty((num_portfolios, 3))
+
+    for start in range(0, num_portfolios, batch_size):
+        stop = min(start + batch_size, num_portfolios)
+        batch = weights[start:stop]
+
+        # Normalized Gamma(alpha) draws are Dirichlet(alpha).
+        batch[:] = rng.standard_gamma(alpha, size=batch.shape, dtype=np.float32)
+        batch /= batch.sum(axis=1, keepdims=True)
+
+        ret, vol, sharpe = portfolio_stats(batch, annual_returns, cov_matrix, risk_free_rate)
+        results[start:stop, 0] = vol
+        results[start:stop, 1] = ret
+        results[start:stop, 2] = sharpe
+
+    results_df = pd.DataFrame(results, columns=["Volatility", "Return", "Sharpe Ratio"])
+    return results_df, weights
+
+
+def min_variance_weights(cov_matrix) -> np.ndarray:
+    """
+    Analytic minimum-variance portfolio, short sales allowed:
+    w = inv(S) 1 / (1' inv(S) 1).
+    """
+    cov = np.asarray(cov_matrix, dtype=float)
+    x = np.linalg.lstsq(cov, np.ones(len(cov)), rcond=None)[0]
+    return x / x.sum()
+
+
+def tangency_weights(annual_returns, cov_matrix, risk_free_rate: float) -> np.ndarray:
+    """
+    Analytic tangency (maximum Sharpe) portfolio, short sales allowed:
+    w = inv(S) (mu - rf) / (1' inv(S) (mu - rf)).
+    """
+    cov = np.asarray(cov_matrix, dtype=float)
+    excess = np.asarray(annual_returns, dtype=float) - risk_free_rate
+    x = np.linalg.lstsq(cov, excess, rcond=None)[0]
+    return x / x.sum()
+
+
+def solve_long_only_qp(
+    cov: np.ndarray,
+    A: np.ndarray,
+    b: np.ndarray,
+    x0: np.ndarray,
+    tol: float = 1e-10,
+    max_iter: int = 500,
+) -> np.ndarray:
+    """
+    Minimize x' cov x subject to A x = b and x >= 0, starting from the
+    feasible point x0 (primal active-set method).
+
+    The working set holds the weights fixed at zero. Each iteration solves
+    the equality-constrained problem on the free weights; a step that would
+    push a weight negative is cut short and that weight joins the working
+    set, and a zero weight with a negative multiplier is released.
+    """
+    x = np.asarray(x0, dtype=float).copy()
+    n, m = len(x), len(b)
+    fixed = x <= tol
+
+    for _ in range(max_iter):
+        free = np.flatnonzero(~fixed)
+        g = cov @ x
+
+        kkt = np.zeros((len(free) + m, len(free) + m))
+        kkt[:len(free), :len(free)] = cov[np.ix_(free, free)]
+        kkt[:len(free), len(free):] = A[:, free].T
+        kkt[len(free):, :len(free)] = A[:, free]
+        rhs = np.concatenate([-g[free], np.zeros(m)])
+
+        solution = np.linalg.lstsq(kkt, rhs, rcond=None)[0]
+        p = np.zeros(n)
+        p[free] = solution[:len(free)]
+
+        if np.abs(p).max() <= tol * max(1.0, np.abs(x).max()):
+            # Stationary on the free set: check the zero weights' multipliers.
+            multipliers = g + A.T @ solution[len(free):]
+            candidates = np.flatnonzero(fixed)
+
+            if len(candidates) == 0 or multipliers[candidates].min() >= -tol:
+                break
+
+            fixed[candidates[np.argmin(multipliers[candidates])]] = False
+            continue
+
+        shrinking = free[p[free] < -tol]
+        steps = -x[shrinking] / p[shrinking]
+        alpha = min(1.0, steps.min()) if len(steps) else 1.0
+
+        x += alpha * p
+        if alpha < 1.0:
+            blocking = shrinking[np.argmin(steps)]
+            x[blocking] = 0.0
+            fixed[blocking] = True
+
+    return np.maximum(x, 0.0)
+
+
+def long_only_min_variance(cov_matrix) -> np.ndarray:
+    cov = np.asarray(cov_matrix, dtype=float)
+    n = len(cov)
+    return solve_long_only_qp(cov, np.ones((1, n)), np.ones(1), np.full(n, 1 / n))
+
+
+def long_only_max_sharpe(annual_returns, cov_matrix, risk_free_rate: float) -> np.ndarray | None:
+    """
+    Long-only maximum Sharpe portfolio, or None when no asset beats the
+    risk-free rate.
+
+    Solved as min y' S y subject to (mu - rf)' y = 1, y >= 0, then
+    w = y / sum(y).
+    """
+    cov = np.asarray(cov_matrix, dtype=float)
+    excess = np.asarray(annual_returns, dtype=float) - risk_free_rate
+
+    best = np.argmax(excess)
+    if excess[best] <= 0:
+        return None
+
+    y0 = np.zeros(len(excess))
+    y0[best] = 1 / excess[best]
+
+    y = solve_long_only_qp(cov, excess[None, :], np.ones(1), y0)
+    return y / y.sum()
+
+
+def efficient_frontier(
+    annual_returns,
+    cov_matrix,
+    n_points: int = FRONTIER_POINTS,
+) -> tuple[pd.DataFrame, np.ndarray]:
+    """
+    Long-only efficient frontier from the minimum-variance portfolio up to
+    the highest-return asset.
+
+    Returns a DataFrame with Return and Volatility columns and the
+    (n_points, tickers) weight array of the frontier portfolios.
+    """
+    mu = np.asarray(annual_returns, dtype=float)
+    cov = np.asarray(cov_matrix, dtype=float)
+    n = len(mu)
+
+    A = np.vstack([np.ones(n), mu])
+    x = long_only_min_variance(cov)
+    top = np.argmax(mu)
+
+    targets = np.linspace(x @ mu, mu[top], n_points)
+    weights = np.empty((n_points, n))
+
+    for i, target in enumerate(targets):
+        # Blend the previous solution with the highest-return asset to get
+        # a feasible start for the next (higher) target return.
+        current = x @ mu
+        if target > current and mu[top] > current:
+            theta = (target - current) / (mu[top] - current)
+            x = (1 - theta) * x
+            x[top] += theta
+
+        x = solve_long_only_qp(cov, A, np.array([1.0, target]), x)
+        weights[i] = x
+
+    ret = weights @ mu
+    vol = np.sqrt(np.maximum(np.einsum("ij,ij->i", weights @ cov, weights), 0.0))
+
+    return pd.DataFrame({"Return": ret, "Volatility": vol}), weights
+
+
+def bin_cloud(
+    volatility,
+    returns,
+    sharpe,
+    bins: int = CLOUD_BINS,
+) -> dict[str, np.ndarray]:
+    """
+    Max Sharpe ratio per (volatility, return) cell, NaN for empty cells.
+
+    Returns the (bins, bins) grid with rows = return bins and columns =
+    volatility bins (ready for imshow with origin="lower"), the extent
+    [vol_min, vol_max, ret_min, ret_max], and the cloud's upper envelope:
+    the highest return reached at or below each volatility bin.
+    """
+    vol = np.asarray(volatility, dtype=float)
+    ret = np.asarray(returns, dtype=float)
+    sharpe = np.asarray(sharpe, dtype=float)
+
+    vol_edges = np.linspace(vol.min(), vol.max(), bins + 1)
+    ret_edges = np.linspace(ret.min(), ret.max(), bins + 1)
+
+    col = np.clip(np.searchsorted(vol_edges, vol, side="right") - 1, 0, bins - 1)
+    row = np.clip(np.searchsorted(ret_edges, ret, side="right") - 1, 0, bins - 1)
+
+    grid = np.full(bins * bins, -np.inf)
+    np.maximum.at(grid, row * bins + col, sharpe)
+    grid = grid.reshape(bins, bins)
+    grid[np.isneginf(grid)] = np.nan
+
+    top_return = np.full(bins, -np.inf)
+    np.maximum.at(top_return, col, ret)
+    envelope = np.maximum.accumulate(top_return)
+
+    return {
+        "grid": grid,
+        "extent": np.array([vol_edges[0], vol_edges[-1], ret_edges[0], ret_edges[-1]]),
+        "envelope_volatility": 0.5 * (vol_edges[:-1] + vol_edges[1:]),
+        "envelope_return": np.where(np.isfinite(envelope), envelope, np.nan),
+    }
+
+
+def month_end_positions(index: pd.DatetimeIndex) -> np.ndarray:
+    """
+    Row positions of the last trading day of every month in index.
+    """
+    positions = pd.Series(np.arange(len(index)), index=index)
+    return positions.groupby(index.to_period("M")).max().to_numpy()
+
+
+def rolling_window_moments(
+    returns: np.ndarray,
+    ends: np.ndarray,
+    window: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Annualized mean and covariance of the window rows (end - window, end]
+    for every end position (increasing, each at least window - 1).
+
+    The running sum and cross-product matrix are carried from one end to
+    the next, adding the rows that enter the window and subtracting the
+    rows that leave it, instead of recomputing each window.
+    """
+    n_assets = returns.shape[1]
+    means = np.empty((len(ends), n_assets))
+    covs = np.empty((len(ends), n_assets, n_assets))
+
+    total = np.zeros(n_assets)
+    cross = np.zeros((n_assets, n_assets))
+    lo = hi = 0  # rows [lo, hi) are in the running sums
+
+    for i, end in enumerate(ends):
+        start = end + 1 - window
+
+        if start >= hi:
+            # No overlap with the previous window: start over.
+            total[:] = 0.0
+            cross[:] = 0.0
+            lo = hi = start
+
+        entering = returns[hi:end + 1]
+        leaving = returns[lo:start]
+
+        total += entering.sum(axis=0) - leaving.sum(axis=0)
+        cross += entering.T @ entering - leaving.T @ leaving
+        lo, hi = start, end + 1
+
+        mean = total / window
+        means[i] = mean * TRADING_DAYS
+        covs[i] = (cross - window * np.outer(mean, mean)) / (window - 1) * TRADING_DAYS
+
+    return means, covs
+
+
+def max_sharpe_batch(means: np.ndarray, covs: np.ndarray, risk_free_rate: float) -> np.ndarray:
+    """
+    Long-only max Sharpe weights for a batch of (mean, covariance) pairs,
+    falling back to min variance when no asset beats the risk-free rate.
+    """
+    weights = np.empty(means.shape)
+
+    for i, (mu, cov) in enumerate(zip(means, covs)):
+        w = long_only_max_sharpe(mu, cov, risk_free_rate)
+        weights[i] = long_only_min_variance(cov) if w is None else w
+
+    return weights
+
+
+def walk_forward_backtest(
+    returns: pd.DataFrame,
+    window: int = TRADING_DAYS,
+    risk_free_rate: float = 0.0,
+    workers: int = 1,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Rebalance at every month end to the long-only max Sharpe portfolio of
+    the trailing window of daily returns, hold it (buy and hold) until the
+    next month end, and track the out-of-sample value.
+
+    Returns a daily value table (Max Sharpe and an equal-weight portfolio
+    rebalanced on the same dates, both starting at 1) and the weights
+    chosen at each rebalance date.
+    """
+    R = returns.to_numpy(dtype=float)
+    n_rows, n_assets = R.shape
+
+    ends = month_end_positions(returns.index)
+    ends = ends[(ends >= window - 1) & (ends < n_rows - 1)]
+
+    if len(ends) == 0:
+        empty_values = pd.DataFrame(columns=["Max Sharpe", "Equal Weight"], dtype=float)
+        return empty_values, pd.DataFrame(columns=returns.columns, dtype=float)
+
+    means, covs = rolling_window_moments(R, ends, window)
+
+    if workers <= 1 or len(ends) < 2 * workers:
+        weights = max_sharpe_batch(means, covs, risk_free_rate)
+    else:
+        batches = np.array_split(np.arange(len(ends)), workers)
+
+        with process_pool(workers) as pool:
+            parts = pool.map(
+                max_sharpe_batch,
+                [means[b] for b in batches],
+                [covs[b] for b in batches],
+                [risk_free_rate] * len(batches),
+            )
+            weights = np.vstack(list(parts))
+
+    equal = np.full(n_assets, 1 / n_assets)
+    bounds = np.append(ends, n_rows - 1)
+    values = np.empty((bounds[-1] - ends[0] + 1, 2))
+    values[0] = 1.0
+    current = np.ones(2)
+
+    for i, end in enumerate(ends):
+        # Buy and hold from the close of end to the next rebalance date.
+        growth = np.cumprod(1 + R[end + 1:bounds[i + 1] + 1], axis=0)
+        period = np.column_stack([growth @ weights[i], growth @ equal]) * current
+
+        offset = end - ends[0] + 1
+        values[offset:offset + len(period)] = period
+        current = period[-1]
+
+    value_df = pd.DataFrame(
+        values,
+        index=returns.index[ends[0]:bounds[-1] + 1],
+        columns=["Max Sharpe", "Equal Weight"],
+    )
+    weights_df = pd.DataFrame(weights, index=returns.index[ends], columns=returns.columns)
+
+    return value_df, weights_df
@@ -0,0 +1,816 @@
+"""
+Monte Carlo path engine
+-----------------------
+Vectorized geometric Brownian motion paths, generated in fixed-size chunks
+so millions of paths never have to be held in memory at once.
+
+- gbm_paths: all increments drawn in one shot, cumulative sum over time.
+  Drop-in replacement for a step-by-step Python loop.
+- simulate_gbm: streams N paths through a PathAccumulator chunk by chunk.
+  Each chunk is reduced to running totals (terminal moments, discounted
+  call payoffs per strike, per-step log-price histograms for percentile
+  bands, a few sample paths) and then discarded.
+- merton_model / heston_model: Merton jump-diffusion and Heston
+  stochastic volatility (full-truncation Euler) with the same interface.
+  Every model turns a block of standard normals into log paths, so all
+  strikes of a grid are priced from the same draws, and the samplers,
+  variance reduction and process pool below work for every model.
+
+Variance reduction (all optional, combinable):
+- sampler="sobol" / "halton": scrambled quasi-random normals, with a
+  Brownian-bridge construction so the first (best distributed) dimensions
+  decide the terminal value and the coarse shape of each path. N is split
+  into n_replicates independently scrambled streams, and the standard
+  error comes from the spread of the replicate estimates.
+- antithetic: every draw z is also used as -z; a pair counts as one sample.
+- control_variate: the discounted terminal price, whose expectation
+  S * exp(-q * T) is known in closed form, corrects the call estimates.
+
+Parallel runs: every random stream gets its own SeedSequence child and can
+run on a process pool; workers return accumulators, never paths.
+
+float32 halves the memory and time of the path chunks. The running totals
+are always accumulated in float64.
+"""
+
+from __future__ import annotations
+
+import copy
+import os
+import warnings
+from concurrent.futures import as_completed
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+from scipy.stats import poisson, qmc
+
+from core.black_scholes import bs_price
+from core.convergence import CONVERGENCE_POINTS, running_from_blocks
+from core.parallel import process_pool
+
+
+DEFAULT_CHUNK_SIZE = 50_000
+DEFAULT_REPLICATES = 16
+MAX_WORKERS = os.cpu_count() or 1
+SAMPLERS = ("pseudo", "sobol", "halton")
+BAND_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Running estimators recorded per block for the convergence chart.
+CONVERGENCE_ESTIMATORS = ("Final Price", "Call Payoff", "Hit Probability")
+
+# Per-step histogram used for streaming percentiles. The range covers
+# +/- HISTOGRAM_SIGMAS standard deviations of the terminal log price.
+HISTOGRAM_BINS = 2000
+HISTOGRAM_SIGMAS = 8.0
+
+
+def gbm_log_increments(z: np.ndarray, T: float, r: float, q: float, sigma: float) -> np.ndarray:
+    """
+    Log-price increments for standard normal draws z of shape (steps, n).
+    """
+    steps = z.shape[0]
+    dt = T / steps
+    drift = (r - q - 0.5 * sigma**2) * dt
+    return (drift + sigma * np.sqrt(dt) * z).astype(z.dtype, copy=False)
+
+
+def log_paths_from_increments(log_S0: float, increments: np.ndarray) -> np.ndarray:
+    """
+    (steps + 1, n) log-price paths: the start value then the cumulative sum.
+    """
+    paths = np.empty((increments.shape[0] + 1, increments.shape[1]), dtype=increments.dtype)
+    paths[0] = log_S0
+    np.cumsum(increments, axis=0, out=paths[1:])
+    paths[1:] += log_S0
+    return paths
+
+
+def gbm_paths(S, T, r, q, sigma, steps, N, dtype=np.float64, rng=None) -> np.ndarray:
+    """
+    Generates paths for a geometric Brownian motion, shape (steps + 1, N).
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    z = rng.standard_normal((steps, N), dtype=dtype)
+    return np.exp(log_paths_from_increments(np.log(S), gbm_log_increments(z, T, r, q, sigma)))
+
+
+@lru_cache(maxsize=32)
+def brownian_bridge_schedule(steps: int) -> tuple[tuple[int, int, int], ...]:
+    """
+    (left, mid, right) points in the order the bridge fills them:
+    breadth-first bisection of [0, steps].
+    """
+    schedule = []
+    intervals = [(0, steps)]
+
+    while intervals:
+        next_intervals = []
+        for left, right in intervals:
+            if right - left < 2:
+                continue
+            mid = (left + right) // 2
+            schedule.append((left, mid, right))
+            next_intervals += [(left, mid), (mid, right)]
+        intervals = next_intervals
+
+    return tuple(schedule)
+
+
+def brownian_bridge(z: np.ndarray) -> np.ndarray:
+    """
+    Map normals z of shape (steps, n) to Brownian increments of the same
+    shape (still iid standard normal). z[0] sets the terminal value,
+    z[1] the midpoint, and so on.
+    """
+    steps = z.shape[0]
+    W = np.empty((steps + 1, z.shape[1]), dtype=z.dtype)
+    W[0] = 0.0
+    W[steps] = np.sqrt(steps) * z[0]
+
+    for k, (left, mid, right) in enumerate(brownian_bridge_schedule(steps), start=1):
+        span = right - left
+        W[mid] = (
+            (right - mid) / span * W[left] +
+            (mid - left) / span * W[right] +
+            np.sqrt((mid - left) * (right - mid) / span) * z[k]
+        )
+
+    return np.diff(W, axis=0)
+
+
+def normal_source(sampler: str, n_dims: int, rng: np.random.Generator, dtype=np.float64, bridge_steps: int | None = None):
+    """
+    draw(n) -> (n_dims, n) standard normals from one random stream.
+
+    Quasi-random draws are bridged in blocks of bridge_steps rows, so a
+    model needing several Brownian motions gets one bridge per motion.
+    """
+    if sampler == "pseudo":
+        return lambda n: rng.standard_normal((n_dims, n), dtype=dtype)
+
+    if sampler == "sobol":
+        engine = qmc.Sobol(d=n_dims, scramble=True, seed=rng)
+    elif sampler == "halton":
+        engine = qmc.Halton(d=n_dims, scramble=True, seed=rng)
+    else:
+        raise ValueError(f"Unknown sampler: {sampler}")
+
+    def draw(n):
+        # Sobol warns when n is not a power of 2; the points stay valid.
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            u = engine.random(n)
+
+        z = ndtri(np.clip(u, 1e-12, 1 - 1e-12)).T
+
+        if bridge_steps:
+            z = np.vstack([
+                brownian_bridge(z[i:i + bridge_steps])
+                for i in range(0, n_dims, bridge_steps)
+            ])
+
+        return np.ascontiguousarray(z, dtype=dtype)
+
+    return draw
+
+
+class PathAccumulator:
+    """
+    Mergeable running totals over simulated log-price paths.
+
+    add() takes one (steps + 1, n) chunk; summary() turns the totals into
+    estimates. Nothing proportional to the number of paths is kept, except
+    the first n_sample_paths paths for plotting and, with keep_terminal,
+    one terminal price per path.
+
+    Call payoffs (Y) and the discounted terminal price (X) are accumulated
+    per sample, where an antithetic pair counts as one sample, so standard
+    errors stay honest. control_mean is the known E[X] used by the control
+    variate, or None to report plain estimates.
+
+    For convergence charts the final price, the discounted payoff of the
+    first strike and the barrier-hit indicator are also summed per block of
+    block_size samples. barrier is touched from below when it is above S,
+    from above otherwise, checked at every time step.
+    """
+
+    def __init__(
+        self,
+        S: float,
+        T: float,
+        r: float,
+        steps: int,
+        strikes=(),
+        log_range: tuple[float, float] | None = None,
+        n_sample_paths: int = 100,
+        n_bins: int = HISTOGRAM_BINS,
+        keep_terminal: bool = False,
+        control_mean: float | None = None,
+        barrier: float | None = None,
+        block_size: int = 1000,
+    ):
+        self.S = S
+        self.T = T
+        self.r = r
+        self.steps = steps
+        self.strikes = np.asarray(strikes, dtype=float)
+        self.discount = np.exp(-r * T)
+        self.n_sample_paths = n_sample_paths
+        self.control_mean = control_mean
+        self.barrier = barrier
+        self.block_size = max(int(block_size), 1)
+
+        if log_range is None:
+            log_range = (np.log(S) - 1.0, np.log(S) + 1.0)
+        self.log_low, self.log_high = log_range
+        self.n_bins = n_bins
+
+        self.n = 0
+        self.terminal_sum = 0.0
+        self.terminal_sumsq = 0.0
+
+        self.n_samples = 0
+        self.y_sum = np.zeros(len(self.strikes))
+        self.y_sumsq = np.zeros(len(self.strikes))
+        self.xy_sum = np.zeros(len(self.strikes))
+        self.x_sum = 0.0
+        self.x_sumsq = 0.0
+
+        n_estimators = len(CONVERGENCE_ESTIMATORS)
+        self.block_counts = np.zeros(0)
+        self.block_sums = np.zeros((0, n_estimators))
+        self.block_sumsqs = np.zeros((0, n_estimators))
+
+        self.histogram = np.zeros((steps + 1, n_bins), dtype=np.int64)
+        self.sample_paths = np.empty((steps + 1, 0))
+        self.keep_terminal = keep_terminal
+        self.terminal_chunks = []
+
+    def add(self, log_paths: np.ndarray, antithetic: bool = False) -> None:
+        """
+        With antithetic=True the second half of the columns must be the
+        mirrored draws of the first half.
+        """
+        n = log_paths.shape[1]
+        terminal = np.exp(log_paths[-1].astype(np.float64))
+
+        self.n += n
+        self.terminal_sum += terminal.sum()
+        self.terminal_sumsq += (terminal**2).sum()
+
+        if self.keep_terminal:
+            self.terminal_chunks.append(terminal.astype(log_paths.dtype))
+
+        x = self.discount * terminal
+        y = self.discount * np.maximum(terminal[:, None] - self.strikes[None, :], 0.0)
+
+        if self.barrier is None:
+            hit = np.zeros(n)
+        elif self.barrier >= self.S:
+            hit = (log_paths.max(axis=0) >= np.log(self.barrier)).astype(float)
+        else:
+            hit = (log_paths.min(axis=0) <= np.log(self.barrier)).astype(float)
+
+        tracked = np.column_stack([
+            terminal,
+            y[:, 0] if len(self.strikes) else np.zeros(n),
+            hit,
+        ])
+
+        if antithetic:
+            half = n // 2
+            x = 0.5 * (x[:half] + x[half:])
+            y = 0.5 * (y[:half] + y[half:])
+            tracked = 0.5 * (tracked[:half] + tracked[half:])
+
+        self._add_blocks(tracked)
+        self.n_samples += len(x)
+        self.x_sum += x.sum()
+        self.x_sumsq += (x**2).sum()
+        self.y_sum += y.sum(axis=0)
+        self.y_sumsq += (y**2).sum(axis=0)
+        self.xy_sum += x @ y
+
+        # One bincount for every time step: offset each step's bin indices.
+        scale = self.n_bins / (self.log_high - self.log_low)
+        bins = ((log_paths - self.log_low) * scale).astype(np.int64)
+        np.clip(bins, 0, self.n_bins - 1, out=bins)
+        bins += (np.arange(self.steps + 1) * self.n_bins)[:, None]
+        self.histogram += np.bincount(
+            bins.ravel(), minlength=(self.steps + 1) * self.n_bins
+        ).reshape(self.steps + 1, self.n_bins)
+
+        missing = self.n_sample_paths - self.sample_paths.shape[1]
+        if missing > 0:
+            self.sample_paths = np.hstack(
+                [self.sample_paths, np.exp(log_paths[:, :missing].astype(np.float64))]
+            )
+
+    def _add_blocks(self, tracked: np.ndarray) -> None:
+        """
+        Sum the (samples, estimators) values into blocks of block_size
+        consecutive samples, continuing from the samples already seen.
+        """
+        block = (self.n_samples + np.arange(len(tracked))) // self.block_size
+        first = block[0]
+        local = block - first
+        n_local = local[-1] + 1
+
+        grow = first + n_local - len(self.block_counts)
+        if grow > 0:
+            self.block_counts = np.pad(self.block_counts, (0, grow))
+            self.block_sums = np.pad(self.block_sums, ((0, grow), (0, 0)))
+            self.block_sumsqs = np.pad(self.block_sumsqs, ((0, grow), (0, 0)))
+
+        rows = slice(first, first + n_local)
+        self.block_counts[rows] += np.bincount(local, minlength=n_local)
+
+        for j in range(tracked.shape[1]):
+            self.block_sums[rows, j] += np.bincount(local, weights=tracked[:, j], minlength=n_local)
+            self.block_sumsqs[rows, j] += np.bincount(local, weights=tracked[:, j] ** 2, minlength=n_local)
+
+    def convergence(self, n_points: int = CONVERGENCE_POINTS) -> dict[str, pd.DataFrame]:
+        """
+        Running mean / standard error / 95% CI of every tracked estimator.
+        """
+        return {
+            name: running_from_blocks(
+                self.block_counts, self.block_sums[:, j], self.block_sumsqs[:, j], n_points=n_points
+            )
+            for j, name in enumerate(CONVERGENCE_ESTIMATORS)
+        }
+
+    def merge(self, other: PathAccumulator) -> PathAccumulator:
+        """
+        Add other's totals; other's samples count as coming after these.
+        """
+        self.n += other.n
+        self.terminal_sum += other.terminal_sum
+        self.terminal_sumsq += other.terminal_sumsq
+
+        self.n_samples += other.n_samples
+        self.y_sum += other.y_sum
+        self.y_sumsq += other.y_sumsq
+        self.xy_sum += other.xy_sum
+        self.x_sum += other.x_sum
+        self.x_sumsq += other.x_sumsq
+
+        self.block_counts = np.concatenate([self.block_counts, other.block_counts])
+        self.block_sums = np.vstack([self.block_sums, other.block_sums])
+        self.block_sumsqs = np.vstack([self.block_sumsqs, other.block_sumsqs])
+
+        self.histogram += other.histogram
+        self.terminal_chunks.extend(other.terminal_chunks)
+
+        missing = self.n_sample_paths - self.sample_paths.shape[1]
+        if missing > 0:
+            self.sample_paths = np.hstack([self.sample_paths, other.sample_paths[:, :missing]])
+
+        return self
+
+    def _moments(self):
+        m = max(self.n_samples, 1)
+        x_mean = self.x_sum / m
+        y_mean = self.y_sum / m
+        x_var = max(self.x_sumsq / m - x_mean**2, 0.0)
+        y_var = np.maximum(self.y_sumsq / m - y_mean**2, 0.0)
+        cov = self.xy_sum / m - x_mean * y_mean
+        return m, x_mean, y_mean, x_var, y_var, cov
+
+    def control_beta(self) -> np.ndarray:
+        """
+        Variance-minimizing control variate coefficient per strike.
+        """
+        _, _, _, x_var, _, cov = self._moments()
+        return cov / x_var if x_var > 0 else np.zeros_like(cov)
+
+    def call_estimates(self, beta=None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Discounted call price and its standard error for every strike.
+        """
+        m, x_mean, y_mean, x_var, y_var, cov = self._moments()
+
+        if self.control_mean is None:
+            return y_mean, np.sqrt(y_var / m)
+
+        beta = self.control_beta() if beta is None else beta
+        price = y_mean - beta * (x_mean - self.control_mean)
+        residual_var = np.maximum(y_var - 2 * beta * cov + beta**2 * x_var, 0.0)
+        return price, np.sqrt(residual_var / m)
+
+    def percentiles(self, percentiles=BAND_PERCENTILES) -> dict[float, np.ndarray]:
+        """
+        Per-step price percentiles from the histograms, linearly
+        interpolated inside each bin.
+        """
+        cdf = np.cumsum(self.histogram, axis=1) / max(self.n, 1)
+        edges = np.linspace(self.log_low, self.log_high, self.n_bins + 1)
+        bands = {}
+
+        for p in percentiles:
+            target = p / 100
+            right = np.argmax(cdf >= target, axis=1)
+            below = np.where(right > 0, cdf[np.arange(len(cdf)), right - 1], 0.0)
+            in_bin = cdf[np.arange(len(cdf)), right] - below
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                fraction = np.where(in_bin > 0, (target - below) / in_bin, 0.5)
+
+            log_price = edges[right] + fraction * (edges[1] - edges[0])
+            bands[p] = np.exp(log_price)
+
+        return bands
+
+    def summary(self) -> dict:
+        n = max(self.n, 1)
+        terminal_mean = self.terminal_sum / n
+        terminal_var = max(self.terminal_sumsq / n - terminal_mean**2, 0.0)
+        call_prices, call_std_errors = self.call_estimates()
+        hit_probability = self.block_sums[:, 2].sum() / max(self.n_samples, 1)
+
+        return {
+            "n_paths": self.n,
+            "terminal_mean": terminal_mean,
+            "terminal_std": np.sqrt(terminal_var),
+            "strikes": self.strikes,
+            "call_prices": call_prices,
+            "call_std_errors": call_std_errors,
+            "hit_probability": hit_probability if self.barrier is not None else np.nan,
+            "convergence": self.convergence(),
+            "percentiles": self.percentiles(),
+            "sample_paths": self.sample_paths,
+            "terminal": np.concatenate(self.terminal_chunks) if self.terminal_chunks else None,
+        }
+
+
+def summarize(accumulators: list[PathAccumulator], replicate_errors: bool = False) -> dict:
+    """
+    Merge the accumulators of independent streams into one summary.
+
+    With replicate_errors (quasi-random replicates) the call standard error
+    is the spread of the per-stream estimates, because quasi-random points
+    are not independent samples within a stream.
+    """
+    total = copy.deepcopy(accumulators[0])
+    for acc in accumulators[1:]:
+        total.merge(acc)
+
+    out = total.summary()
+
+    if replicate_errors and len(accumulators) > 1 and len(total.strikes):
+        beta = total.control_beta() if total.control_mean is not None else None
+        estimates = np.array([acc.call_estimates(beta)[0] for acc in accumulators])
+        out["call_std_errors"] = estimates.std(axis=0, ddof=1) / np.sqrt(len(accumulators))
+
+    return out
+
+
+def paths_for_error(std_error, n_paths: int, target_error: float):
+    """
+    Paths needed to bring std_error down to target_error, assuming the
+    usual 1 / sqrt(N) rate (conservative for quasi-random samplers).
+    """
+    std_error = np.asarray(std_error, dtype=float)
+    return np.ceil(n_paths * (std_error / target_error) ** 2)
+
+
+def stream_seeds(seed, sampler: str, n_replicates: int = DEFAULT_REPLICATES, workers: int = 1) -> list[np.random.SeedSequence]:
+    """
+    One independent SeedSequence per random stream.
+
+    Pseudo-random runs use one stream per worker, quasi-random runs at
+    least n_replicates scrambled streams. The streams (and therefore the
+    result) depend only on seed, sampler, n_replicates and workers.
+    """
+    if sampler == "pseudo":
+        n_streams = max(workers, 1)
+    else:
+        n_streams = max(n_replicates, workers, 2)
+
+    return np.random.SeedSequence(seed).spawn(n_streams)
+
+
+def simulate_log_paths(
+    make_log_paths,
+    n_dims: int,
+    per_stream: int,
+    new_accumulator,
+    seeds: list[np.random.SeedSequence],
+    sampler: str = "pseudo",
+    antithetic: bool = False,
+    bridge_steps: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    dtype=np.float32,
+) -> list[PathAccumulator]:
+    """
+    Generic chunked driver: make_log_paths(z) turns (n_dims, n) normals into
+    (steps + 1, n) log paths, new_accumulator() returns an empty
+    PathAccumulator. Runs per_stream paths for every seed and returns one
+    accumulator per stream.
+    """
+    accumulators = []
+
+    for child in seeds:
+        draw = normal_source(sampler, n_dims, np.random.default_rng(child), dtype, bridge_steps)
+        acc = new_accumulator()
+        done = 0
+
+        while done < per_stream:
+            n = min(chunk_size, per_stream - done)
+
+            if antithetic:
+                z = draw(max(n // 2, 1))
+                z = np.concatenate([z, -z], axis=1)
+            else:
+                z = draw(n)
+
+            acc.add(make_log_paths(z), antithetic=antithetic)
+            done += z.shape[1]
+
+        accumulators.append(acc)
+
+    return accumulators
+
+
+def gbm_log_range(S: float, T: float, r: float, q: float, sigma: float) -> tuple[float, float]:
+    """
+    Histogram range for log prices: the start value and the mean terminal
+    log price, padded by HISTOGRAM_SIGMAS terminal standard deviations.
+    """
+    center = np.log(S) + (r - q - 0.5 * sigma**2) * T
+    width = HISTOGRAM_SIGMAS * sigma * np.sqrt(T)
+    return min(np.log(S), center) - width, max(np.log(S), center) + width
+
+
+def gbm_model(S, T, r, q, sigma, steps, control_variate=False, **accumulator_args):
+    """
+    (make_log_paths, new_accumulator, n_dims) for simulate_log_paths.
+    accumulator_args (strikes, barrier, ...) go to PathAccumulator.
+    """
+    log_S0 = np.log(S)
+
+    def make_log_paths(z):
+        return log_paths_from_increments(log_S0, gbm_log_increments(z, T, r, q, sigma))
+
+    def new_accumulator():
+        return PathAccumulator(
+            S, T, r, steps,
+            log_range=gbm_log_range(S, T, r, q, sigma),
+            control_mean=S * np.exp(-q * T) if control_variate else None,
+            **accumulator_args,
+        )
+
+    return make_log_paths, new_accumulator, steps
+
+
+def merton_log_increments(z: np.ndarray, T, r, q, sigma, lam, mu_jump, sigma_jump) -> np.ndarray:
+    """
+    Log-price increments of the Merton jump-diffusion for normals z of
+    shape (3 * steps, n): diffusion, jump count and jump size blocks.
+
+    Jump counts come from the Poisson inverse CDF of the second block, so
+    quasi-random and antithetic draws carry over to the jumps. Given k
+    jumps in a step their summed log size is k * mu + sqrt(k) * sigma * z.
+    """
+    steps = z.shape[0] // 3
+    dt = T / steps
+    z_diffusion, z_count, z_size = z[:steps], z[steps:2 * steps], z[2 * steps:]
+
+    # Compensator keeps the discounted price a martingale.
+    k = np.exp(mu_jump + 0.5 * sigma_jump**2) - 1
+    drift = (r - q - lam * k - 0.5 * sigma**2) * dt
+
+    max_jumps = int(poisson.ppf(1 - 1e-12, lam * dt)) + 1
+    cdf = poisson.cdf(np.arange(max_jumps), lam * dt)
+    jumps = np.searchsorted(cdf, ndtr(z_count)).astype(z.dtype)
+
+    increments = drift + sigma * np.sqrt(dt) * z_diffusion
+    increments += jumps * mu_jump + np.sqrt(jumps) * sigma_jump * z_size
+    return increments.astype(z.dtype, copy=False)
+
+
+def merton_call_price(S, K, T, r, sigma, lam, mu_jump, sigma_jump, q=0.0, n_terms: int = 60):
+    """
+    Merton (1976) closed-form call price: a Poisson-weighted sum of
+    Black-Scholes prices. K may be an array.
+    """
+    k = np.exp(mu_jump + 0.5 * sigma_jump**2) - 1
+    lam_prime = lam * (1 + k)
+    n = np.arange(n_terms)[:, None]
+
+    weights = poisson.pmf(n, lam_prime * T)
+    sigma_n = np.sqrt(sigma**2 + n * sigma_jump**2 / T)
+    r_n = r - lam * k + n * np.log(1 + k) / T
+
+    prices = bs_price(S, np.atleast_1d(K)[None, :], T, r_n, sigma_n, "call", q)
+    return (weights * prices).sum(axis=0)
+
+
+def merton_model(S, T, r, q, sigma, lam, mu_jump, sigma_jump, steps, control_variate=False, **accumulator_args):
+    """
+    (make_log_paths, new_accumulator, n_dims) for the Merton jump-diffusion.
+    lam is jumps per year, log jump sizes are N(mu_jump, sigma_jump^2).
+    """
+    log_S0 = np.log(S)
+    total_vol = np.sqrt(sigma**2 + lam * (mu_jump**2 + sigma_jump**2))
+
+    def make_log_paths(z):
+        increments = merton_log_increments(z, T, r, q, sigma, lam, mu_jump, sigma_jump)
+        return log_paths_from_increments(log_S0, increments)
+
+    def new_accumulator():
+        return PathAccumulator(
+            S, T, r, steps,
+            log_range=gbm_log_range(S, T, r, q, total_vol),
+            control_mean=S * np.exp(-q * T) if control_variate else None,
+            **accumulator_args,
+        )
+
+    return make_log_paths, new_accumulator, 3 * steps
+
+
+def heston_log_paths(z: np.ndarray, S, T, r, q, v0, kappa, theta, xi, rho) -> np.ndarray:
+    """
+    Heston log paths, full-truncation Euler, for normals z of shape
+    (2 * steps, n): price shocks, then independent variance shocks that
+    are correlated with the price shocks by rho.
+    """
+    steps = z.shape[0] // 2
+    n = z.shape[1]
+    dt = T / steps
+    sqrt_dt = np.sqrt(dt)
+    rho_bar = np.sqrt(1 - rho**2)
+
+    paths = np.empty((steps + 1, n), dtype=z.dtype)
+    paths[0] = np.log(S)
+    v = np.full(n, v0, dtype=z.dtype)
+
+    for t in range(steps):
+        z_price, z_var = z[t], z[steps + t]
+        v_plus = np.maximum(v, 0)
+        sqrt_v = np.sqrt(v_plus)
+
+        paths[t + 1] = paths[t] + (r - q - 0.5 * v_plus) * dt + sqrt_v * sqrt_dt * z_price
+        v = v + kappa * (theta - v_plus) * dt + xi * sqrt_v * sqrt_dt * (rho * z_price + rho_bar * z_var)
+
+    return paths
+
+
+def heston_model(S, T, r, q, v0, kappa, theta, xi, rho, steps, control_variate=False, **accumulator_args):
+    """
+    (make_log_paths, new_accumulator, n_dims) for the Heston model.
+    v0 and theta are variances (0.04 = 20% vol), xi is the vol of variance.
+    """
+    vol_bound = np.sqrt(max(v0, theta)) + xi
+
+    def make_log_paths(z):
+        return heston_log_paths(z, S, T, r, q, v0, kappa, theta, xi, rho)
+
+    def new_accumulator():
+        return PathAccumulator(
+            S, T, r, steps,
+            log_range=gbm_log_range(S, T, r, q, vol_bound),
+            control_mean=S * np.exp(-q * T) if control_variate else None,
+            **accumulator_args,
+        )
+
+    return make_log_paths, new_accumulator, 2 * steps
+
+
+MODELS = {
+    "gbm": gbm_model,
+    "merton": merton_model,
+    "heston": heston_model,
+}
+
+
+def run_streams(model: str, model_args: dict, seeds, per_stream: int, run_args: dict) -> list[PathAccumulator]:
+    """
+    Simulate the given streams of one model. Module level (and built from
+    plain arguments) so it can run in a worker process.
+    """
+    make_log_paths, new_accumulator, n_dims = MODELS[model](**model_args)
+
+    return simulate_log_paths(
+        make_log_paths,
+        n_dims=n_dims,
+        per_stream=per_stream,
+        new_accumulator=new_accumulator,
+        seeds=seeds,
+        bridge_steps=model_args["steps"],
+        **run_args,
+    )
+
+
+def simulate(
+    model: str,
+    model_args: dict,
+    N: int,
+    sampler: str = "pseudo",
+    antithetic: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    dtype=np.float32,
+    seed=None,
+    n_replicates: int = DEFAULT_REPLICATES,
+    workers: int = 1,
+    progress=None,
+) -> dict:
+    """
+    Run N paths of a model from MODELS and summarize them.
+
+    With workers > 1 every stream is a task on a process pool. Workers send
+    back only their accumulators, and the accumulators are merged in stream
+    order, so the result is bit-for-bit the same for a given seed and
+    worker count whatever order the tasks finish in.
+
+    progress(fraction) is called as streams finish.
+    """
+    seeds = stream_seeds(seed, sampler, n_replicates, workers)
+    per_stream = -(-N // len(seeds))
+
+    # About two convergence blocks per chart point over the whole run.
+    samples = per_stream * len(seeds) // (2 if antithetic else 1)
+    model_args = {**model_args, "block_size": max(1, samples // (2 * CONVERGENCE_POINTS))}
+
+    run_args = {
+        "sampler": sampler,
+        "antithetic": antithetic,
+        "chunk_size": chunk_size,
+        "dtype": dtype,
+    }
+
+    if workers <= 1:
+        accumulators = []
+        for i, child in enumerate(seeds, start=1):
+            accumulators += run_streams(model, model_args, [child], per_stream, run_args)
+            if progress is not None:
+                progress(i / len(seeds))
+
+        return summarize(accumulators, replicate_errors=sampler != "pseudo")
+
+    accumulators = [None] * len(seeds)
+
+    with process_pool(workers) as pool:
+        futures = {
+            pool.submit(run_streams, model, model_args, [child], per_stream, run_args): i
+            for i, child in enumerate(seeds)
+        }
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            accumulators[futures[future]] = future.result()[0]
+            if progress is not None:
+                progress(done / len(seeds))
+
+    return summarize(accumulators, replicate_errors=sampler != "pseudo")
+
+
+def simulate_gbm(
+    S: float,
+    T: float,
+    r: float,
+    q: float,
+    sigma: float,
+    steps: int,
+    N: int,
+    strikes=(),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    dtype=np.float32,
+    seed=None,
+    n_sample_paths: int = 100,
+    keep_terminal: bool = False,
+    barrier: float | None = None,
+    sampler: str = "pseudo",
+    antithetic: bool = False,
+    control_variate: bool = False,
+    n_replicates: int = DEFAULT_REPLICATES,
+    workers: int = 1,
+    progress=None,
+) -> dict:
+    """
+    Stream N GBM paths in chunks of chunk_size and return the summary of
+    a PathAccumulator (terminal moments, call prices and standard errors
+    for strikes, barrier-hit probability, convergence tables, percentile
+    bands, sample paths).
+    """
+    model_args = {
+        "S": S, "T": T, "r": r, "q": q, "sigma": sigma, "steps": steps,
+        "strikes": tuple(np.atleast_1d(strikes).tolist()),
+        "n_sample_paths": n_sample_paths,
+        "keep_terminal": keep_terminal,
+        "barrier": barrier,
+        "control_variate": control_variate,
+    }
+
+    return simulate(
+        "gbm", model_args, N,
+        sampler=sampler,
+        antithetic=antithetic,
+        chunk_size=chunk_size,
+        dtype=dtype,
+        seed=seed,
+        n_replicates=n_replicates,
+        workers=workers,
+        progress=progress,
+    )
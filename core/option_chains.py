@@ -0,0 +1,341 @@
+"""
+Option chain loading and per-contract metrics
+---------------------------------------------
+- fetch_chain: one expiration from Yahoo as a long-format table.
+- fetch_surface: every expiration of a ticker, fetched concurrently on a
+  bounded thread pool and merged into one table keyed by
+  (expiration, strike, type).
+- add_contract_metrics: IV %, delta, period return and CAGR for every row,
+  computed column-wise. IV is also solved from the bid/ask mid and from
+  lastPrice, because Yahoo's impliedVolatility is often stale or zero.
+
+- load_universe / screen_puts: the cash-secured put screener. Chains for a
+  whole watchlist are fetched on a worker pool, every contract gets the
+  metrics above, and the best puts inside a delta band are returned.
+
+CAGR uses lastPrice with the same capital bases as the chain page:
+stock price for calls (covered call) and strike for puts (cash-secured put).
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from core.black_scholes import bs_greeks, implied_volatility
+
+
+CHAIN_KEY = ["expiration", "strike", "type"]
+
+# Upper bound on concurrent option_chain requests per ticker.
+CHAIN_WORKERS = 8
+
+# Upper bound on concurrent requests for a whole watchlist.
+UNIVERSE_WORKERS = 16
+
+
+def calc_period_return(last_price, capital_base):
+    """
+    Period Return = last_price / capital_base
+    Returned as percent. Works on scalars or whole columns.
+    """
+    last_price = np.asarray(last_price, dtype=float)
+    capital_base = np.asarray(capital_base, dtype=float)
+
+    valid = (last_price >= 0) & (capital_base > 0)
+    safe_base = np.where(valid, capital_base, 1.0)
+
+    return np.where(valid, last_price / safe_base * 100, np.nan)
+
+
+def calc_cagr_by_last_price(last_price, capital_base, dte):
+    """
+    CAGR = (1 + last_price / capital_base) ^ (365 / DTE) - 1
+    Returned as percent. Works on scalars or whole columns, dte included.
+    """
+    last_price = np.asarray(last_price, dtype=float)
+    capital_base = np.asarray(capital_base, dtype=float)
+    dte = np.asarray(dte, dtype=float)
+
+    valid = (last_price > 0) & (capital_base > 0) & (dte > 0)
+    safe_base = np.where(valid, capital_base, 1.0)
+    safe_dte = np.where(valid, dte, 1.0)
+
+    cagr = ((1 + last_price / safe_base) ** (365 / safe_dte) - 1) * 100
+    return np.where(valid, cagr, np.nan)
+
+
+def calc_mid_price(bid, ask):
+    """
+    (bid + ask) / 2, or NaN when either side is missing, zero or crossed.
+    """
+    bid = np.asarray(bid, dtype=float)
+    ask = np.asarray(ask, dtype=float)
+
+    valid = (bid > 0) & (ask > 0) & (ask >= bid)
+    return np.where(valid, (bid + ask) / 2, np.nan)
+
+
+def days_to_expiration(expiration, today: date | None = None):
+    """
+    Calendar days until expiration, at least 1. Accepts one date string
+    or a column of them.
+    """
+    today = pd.Timestamp(today or date.today())
+    expiration = pd.to_datetime(np.asarray(expiration))
+    days = (expiration - today) // pd.Timedelta(days=1)
+    return np.maximum(np.asarray(days), 1)
+
+
+def get_stock_price(ticker_obj: yf.Ticker) -> float:
+    try:
+        price = ticker_obj.fast_info.get("last_price")
+        if price is not None and price > 0:
+            return float(price)
+    except Exception:
+        pass
+
+    hist = ticker_obj.history(period="5d")
+    if hist.empty:
+        raise ValueError("Could not get stock price.")
+
+    return float(hist["Close"].dropna().iloc[-1])
+
+
+def fetch_quote(ticker: str) -> tuple[float, list[str]]:
+    """
+    Stock price and option expirations of one ticker.
+    """
+    ticker_obj = yf.Ticker(ticker)
+    return get_stock_price(ticker_obj), list(ticker_obj.options)
+
+
+def fetch_chain(ticker_obj: yf.Ticker, expiration: str) -> pd.DataFrame:
+    """
+    Calls and puts of one expiration stacked into a long-format table.
+    """
+    chain = ticker_obj.option_chain(expiration)
+
+    parts = [
+        chain.calls.assign(type="CALL"),
+        chain.puts.assign(type="PUT"),
+    ]
+    df = pd.concat(parts, ignore_index=True)
+    df.insert(0, "expiration", expiration)
+    return df
+
+
+def fetch_surface(
+    ticker: str,
+    expirations: list[str] | None = None,
+    max_workers: int = CHAIN_WORKERS,
+) -> tuple[pd.DataFrame, list[str]]:
+    """
+    Fetch every expiration (or the given ones) concurrently.
+
+    Returns the merged long-format table and the expirations that failed
+    to load, so one bad expiration does not lose the whole surface.
+    """
+    ticker_obj = yf.Ticker(ticker)
+
+    # Reading tk.options once up front also primes the Ticker's expiration
+    # map, so the worker threads only issue the per-expiration requests.
+    all_expirations = list(ticker_obj.options)
+    expirations = all_expirations if expirations is None else list(expirations)
+
+    if not expirations:
+        return pd.DataFrame(columns=CHAIN_KEY), []
+
+    def load(expiration):
+        try:
+            return fetch_chain(ticker_obj, expiration)
+        except Exception:
+            return None
+
+    workers = max(1, min(max_workers, len(expirations)))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        chains = list(pool.map(load, expirations))
+
+    failed = [exp for exp, chain in zip(expirations, chains) if chain is None]
+    loaded = [chain for chain in chains if chain is not None and not chain.empty]
+
+    if not loaded:
+        return pd.DataFrame(columns=CHAIN_KEY), failed
+
+    surface = (
+        pd.concat(loaded, ignore_index=True)
+        .drop_duplicates(subset=CHAIN_KEY, keep="last")
+        .sort_values(CHAIN_KEY)
+        .reset_index(drop=True)
+    )
+
+    return surface, failed
+
+
+def add_contract_metrics(
+    surface: pd.DataFrame,
+    stock_price: float,
+    r: float,
+    today: date | None = None,
+) -> pd.DataFrame:
+    """
+    Add DTE, IV % (Yahoo), IV Mid %, IV Last %, Delta, ITM,
+    Period Return % and CAGR % to a long-format chain.
+    """
+    df = surface.copy()
+
+    is_call = (df["type"] == "CALL").to_numpy()
+    strike = df["strike"].to_numpy(dtype=float)
+    last_price = df["lastPrice"].to_numpy(dtype=float)
+
+    df["DTE"] = days_to_expiration(df["expiration"], today)
+    capital_base = np.where(is_call, stock_price, strike)
+
+    T = df["DTE"].to_numpy() / 365
+    option_type = np.where(is_call, "call", "put")
+
+    df["IV %"] = df["impliedVolatility"] * 100
+
+    df["IV Mid %"] = implied_volatility(
+        price=calc_mid_price(df["bid"], df["ask"]),
+        S=stock_price,
+        K=strike,
+        T=T,
+        r=r,
+        option_type=option_type,
+    ) * 100
+
+    df["IV Last %"] = implied_volatility(
+        price=last_price,
+        S=stock_price,
+        K=strike,
+        T=T,
+        r=r,
+        option_type=option_type,
+    ) * 100
+
+    df["Delta"] = bs_greeks(
+        S=stock_price,
+        K=strike,
+        T=T,
+        r=r,
+        sigma=df["impliedVolatility"].to_numpy(dtype=float),
+        option_type=option_type,
+    )["delta"]
+
+    df["ITM"] = np.where(is_call, stock_price > strike, stock_price < strike)
+    df["Period Return %"] = calc_period_return(last_price, capital_base)
+    df["CAGR %"] = calc_cagr_by_last_price(last_price, capital_base, df["DTE"].to_numpy())
+
+    return df
+
+
+def load_universe(
+    tickers: list[str],
+    r: float,
+    max_dte: int | None = None,
+    load_quote=fetch_quote,
+    load_chain=None,
+    max_workers: int = UNIVERSE_WORKERS,
+    today: date | None = None,
+) -> tuple[pd.DataFrame, list[str]]:
+    """
+    Chains with contract metrics for a whole watchlist.
+
+    load_quote(ticker) -> (stock price, expirations) and
+    load_chain(ticker, expiration) -> long-format chain can be swapped for
+    cached versions; the defaults call Yahoo directly.
+
+    Returns one long-format table with a ticker column, and a list of the
+    tickers / (ticker expiration) pairs that failed to load.
+    """
+    if load_chain is None:
+        def load_chain(ticker, expiration):
+            return fetch_chain(yf.Ticker(ticker), expiration)
+
+    def safe(func, *args):
+        try:
+            return func(*args)
+        except Exception:
+            return None
+
+    tickers = list(dict.fromkeys(tickers))
+    failed = []
+
+    if not tickers:
+        return pd.DataFrame(columns=["ticker"] + CHAIN_KEY), failed
+
+    workers = max(1, min(max_workers, len(tickers)))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        quotes = dict(zip(tickers, pool.map(lambda t: safe(load_quote, t), tickers)))
+
+        jobs = []
+        for ticker, quote in quotes.items():
+            if quote is None:
+                failed.append(ticker)
+                continue
+
+            expirations = list(quote[1])
+            if max_dte is not None and expirations:
+                dte = days_to_expiration(expirations, today)
+                expirations = [exp for exp, days in zip(expirations, dte) if days <= max_dte]
+
+            jobs.extend((ticker, exp) for exp in expirations)
+
+        chains = list(pool.map(lambda job: safe(load_chain, *job), jobs))
+
+    by_ticker: dict[str, list[pd.DataFrame]] = {}
+
+    for (ticker, expiration), chain in zip(jobs, chains):
+        if chain is None:
+            failed.append(f"{ticker} {expiration}")
+        elif not chain.empty:
+            by_ticker.setdefault(ticker, []).append(chain)
+
+    frames = []
+
+    for ticker, chains_ in by_ticker.items():
+        surface = pd.concat(chains_, ignore_index=True)
+        surface = add_contract_metrics(surface, stock_price=quotes[ticker][0], r=r, today=today)
+        surface.insert(0, "ticker", ticker)
+        surface.insert(1, "Stock Price", quotes[ticker][0])
+        frames.append(surface)
+
+    if not frames:
+        return pd.DataFrame(columns=["ticker"] + CHAIN_KEY), failed
+
+    return pd.concat(frames, ignore_index=True), failed
+
+
+def screen_puts(
+    universe: pd.DataFrame,
+    delta_band: tuple[float, float] = (0.10, 0.30),
+    min_open_interest: int = 100,
+    top_n: int = 50,
+    sort_by: str = "CAGR %",
+) -> pd.DataFrame:
+    """
+    Best cash-secured puts: |Delta| inside delta_band, open interest of at
+    least min_open_interest, ranked by sort_by (highest first).
+    """
+    if universe.empty:
+        return universe
+
+    abs_delta = universe["Delta"].abs()
+    open_interest = universe["openInterest"].fillna(0)
+
+    puts = universe[
+        (universe["type"] == "PUT") &
+        (abs_delta >= delta_band[0]) &
+        (abs_delta <= delta_band[1]) &
+        (open_interest >= min_open_interest) &
+        universe[sort_by].notna()
+    ]
+
+    return puts.nlargest(top_n, sort_by).reset_index(drop=True)
@@ -0,0 +1,37 @@
+"""
+Process pools
+-------------
+One place to create the process pools used by the core engines
+(Monte Carlo streams, walk-forward QP solves, drawdown tables), and the
+background thread that long page runs are submitted to.
+
+Workers are spawned, not forked: forking a threaded Streamlit server is
+not safe. Spawned workers re-import the task's module, so tasks must be
+module-level functions.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+
+
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    ProcessPoolExecutor with workers spawned (never forked) processes.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+@lru_cache(maxsize=1)
+def background_executor() -> ThreadPoolExecutor:
+    """
+    One shared background thread. A page submits its run here and polls
+    the future, so the Streamlit script thread never waits on the run
+    (or on the process pool it starts). Runs queue in submission order.
+    """
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="background-run")
@@ -0,0 +1,411 @@
+"""
+Local OHLCV price store
+-----------------------
+One Parquet file per ticker under data/prices/, shared by every page.
+
+How it works:
+- The first request for a ticker downloads its full daily history once.
+- Later requests only download the bars from the last stored date onward
+  and append them, so refreshing 30 years of SPY costs one new bar.
+- Bars are stored as returned by yfinance with auto_adjust=False
+  (Close and Adj Close side by side), so both the raw and the
+  auto-adjusted views are served from the same file.
+- The refresh re-downloads the last stored bar. If Yahoo changed that bar's
+  Close or Adj Close (dividend or split re-adjustment), the ticker is
+  downloaded again in full.
+
+load_close_matrix() and load_ohlcv_batch() serve a whole watchlist from one
+batched refresh.
+
+Set the PRICE_STORE_DIR environment variable to move the store.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+
+STORE_DIR = Path(
+    os.environ.get(
+        "PRICE_STORE_DIR",
+        Path(__file__).resolve().parent.parent / "data" / "prices",
+    )
+)
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
+
+# Do not hit Yahoo again for a ticker refreshed less than this many seconds ago.
+REFRESH_SECONDS = 60 * 30
+
+# Upper bound on concurrent Yahoo requests for multi-ticker refreshes.
+DOWNLOAD_THREADS = 16
+
+
+def ticker_path(ticker: str) -> Path:
+    """
+    Parquet file for one ticker. Characters such as ^ in ^VIX are replaced.
+    """
+    safe_name = re.sub(r"[^A-Z0-9._-]", "_", ticker.strip().upper())
+    return STORE_DIR / f"{safe_name}.parquet"
+
+
+def empty_ohlcv() -> pd.DataFrame:
+    return pd.DataFrame(
+        columns=OHLCV_COLUMNS,
+        index=pd.DatetimeIndex([], name="Date"),
+        dtype=float,
+    )
+
+
+def normalize_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Bring a single-ticker yf.download frame into the store layout:
+    flat OHLCV columns, tz-naive sorted DatetimeIndex, no empty bars.
+    """
+    if df is None or df.empty:
+        return empty_ohlcv()
+
+    df = df.copy()
+
+    if isinstance(df.columns, pd.MultiIndex):
+        level_0 = df.columns.get_level_values(0)
+        level_1 = df.columns.get_level_values(1)
+        df.columns = level_0 if "Close" in level_0 else level_1
+
+    df = df.loc[:, [col for col in OHLCV_COLUMNS if col in df.columns]]
+    df = df.apply(pd.to_numeric, errors="coerce").astype(float)
+
+    index = pd.to_datetime(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    df.index = index.rename("Date")
+
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    return df.dropna(subset=["Close"])
+
+
+def download_ohlcv(ticker: str, start: pd.Timestamp | None = None) -> pd.DataFrame:
+    """
+    Download daily bars from Yahoo. Without start the full history is fetched.
+    """
+    kwargs = dict(auto_adjust=False, actions=False, progress=False, threads=False)
+
+    if start is None:
+        kwargs["period"] = "max"
+    else:
+        kwargs["start"] = start
+
+    return normalize_ohlcv(yf.download(ticker, **kwargs))
+
+
+def read_store(ticker: str) -> pd.DataFrame:
+    path = ticker_path(ticker)
+
+    if not path.exists():
+        return empty_ohlcv()
+
+    return pd.read_parquet(path)
+
+
+def write_store(ticker: str, df: pd.DataFrame) -> None:
+    """
+    Write atomically so a concurrent reader never sees a half-written file.
+    """
+    path = ticker_path(ticker)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+
+    try:
+        df.to_parquet(tmp_name)
+        os.replace(tmp_name, path)
+    finally:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+
+
+def history_was_readjusted(stored: pd.DataFrame, fresh: pd.DataFrame) -> bool:
+    """
+    True if Yahoo changed bars we already have. The newest stored bar is
+    skipped because it may have been saved while the session was still open.
+    """
+    overlap = stored.index[:-1].intersection(fresh.index)
+
+    if overlap.empty:
+        return False
+
+    cols = ["Close", "Adj Close"]
+    old = stored.loc[overlap, cols].to_numpy()
+    new = fresh.loc[overlap, cols].to_numpy()
+
+    return not np.allclose(old, new, rtol=1e-6, equal_nan=True)
+
+
+def is_fresh(ticker: str, max_age: float | None) -> bool:
+    path = ticker_path(ticker)
+
+    if max_age is None or not path.exists():
+        return False
+
+    return time.time() - path.stat().st_mtime < max_age
+
+
+def incremental_start(stored: pd.DataFrame) -> pd.Timestamp:
+    """
+    Re-download the last two stored bars: one to detect re-adjusted history,
+    and the newest one because it may be a partial intraday bar.
+    """
+    return stored.index[-2] if len(stored) > 1 else stored.index[-1]
+
+
+def merge_update(ticker: str, stored: pd.DataFrame, fresh: pd.DataFrame) -> pd.DataFrame | None:
+    """
+    Append freshly downloaded bars to the stored history and save it.
+
+    Returns None when Yahoo re-adjusted stored bars and the ticker needs a
+    full download instead.
+    """
+    if fresh.empty:
+        # Nothing new (or Yahoo is down): keep serving the stored bars
+        # and wait max_age before asking again.
+        ticker_path(ticker).touch()
+        return stored
+
+    if history_was_readjusted(stored, fresh):
+        return None
+
+    combined = pd.concat([stored[stored.index < fresh.index[0]], fresh])
+    write_store(ticker, combined)
+    return combined
+
+
+def refresh_ticker(ticker: str, max_age: float | None = REFRESH_SECONDS) -> pd.DataFrame:
+    """
+    Bring the stored history of one ticker up to date and return all of it.
+
+    Only bars from the last two stored dates onward are downloaded.
+    max_age=None forces a network check.
+    """
+    stored = read_store(ticker)
+
+    if not stored.empty:
+        if is_fresh(ticker, max_age):
+            return stored
+
+        fresh = download_ohlcv(ticker, start=incremental_start(stored))
+        combined = merge_update(ticker, stored, fresh)
+
+        if combined is not None:
+            return combined
+
+    combined = download_ohlcv(ticker)
+
+    if combined.empty:
+        return stored
+
+    write_store(ticker, combined)
+    return combined
+
+
+def split_batch(df: pd.DataFrame, tickers: list[str]) -> dict[str, pd.DataFrame]:
+    """
+    Split a multi-ticker yf.download(group_by="ticker") frame per ticker.
+    """
+    frames = {}
+
+    for ticker in tickers:
+        if df is None or df.empty or not isinstance(df.columns, pd.MultiIndex):
+            frames[ticker] = empty_ohlcv()
+        elif ticker in df.columns.get_level_values(0):
+            frames[ticker] = normalize_ohlcv(df[ticker])
+        elif ticker in df.columns.get_level_values(1):
+            frames[ticker] = normalize_ohlcv(df.xs(ticker, axis=1, level=1))
+        else:
+            frames[ticker] = empty_ohlcv()
+
+    return frames
+
+
+def download_batch(tickers: list[str], start: pd.Timestamp | None = None) -> dict[str, pd.DataFrame]:
+    """
+    One yf.download call for many tickers. yfinance fetches them on a
+    bounded thread pool of DOWNLOAD_THREADS workers.
+    """
+    kwargs = dict(
+        auto_adjust=False,
+        actions=False,
+        progress=False,
+        group_by="ticker",
+        threads=min(DOWNLOAD_THREADS, len(tickers)),
+    )
+
+    if start is None:
+        kwargs["period"] = "max"
+    else:
+        kwargs["start"] = start
+
+    return split_batch(yf.download(tickers, **kwargs), tickers)
+
+
+def refresh_tickers(tickers: list[str], max_age: float | None = REFRESH_SECONDS) -> dict[str, pd.DataFrame]:
+    """
+    Batched refresh_ticker for a watchlist.
+
+    Stale tickers are grouped by the date their update starts from, so a
+    watchlist refreshed together costs one request for the new bars plus
+    one request for tickers never seen before.
+    """
+    histories = {}
+    updates: dict[pd.Timestamp, list[str]] = {}
+    stored_frames = {}
+    full_downloads = []
+
+    for ticker in dict.fromkeys(tickers):
+        stored = read_store(ticker)
+
+        if stored.empty:
+            full_downloads.append(ticker)
+        elif is_fresh(ticker, max_age):
+            histories[ticker] = stored
+        else:
+            stored_frames[ticker] = stored
+            updates.setdefault(incremental_start(stored), []).append(ticker)
+
+    for start, group in updates.items():
+        for ticker, fresh in download_batch(group, start=start).items():
+            combined = merge_update(ticker, stored_frames[ticker], fresh)
+
+            if combined is None:
+                full_downloads.append(ticker)
+            else:
+                histories[ticker] = combined
+
+    if full_downloads:
+        for ticker, combined in download_batch(full_downloads).items():
+            if not combined.empty:
+                write_store(ticker, combined)
+                histories[ticker] = combined
+            else:
+                histories[ticker] = stored_frames.get(ticker, empty_ohlcv())
+
+    return {ticker: histories[ticker] for ticker in dict.fromkeys(tickers)}
+
+
+def adjust_ohlc(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Apply the Adj Close / Close factor to Open, High, Low and Close.
+    Matches yf.download(auto_adjust=True): no Adj Close column in the output.
+    """
+    factor = df["Adj Close"] / df["Close"]
+
+    adjusted = df.drop(columns="Adj Close")
+    adjusted[PRICE_COLUMNS] = adjusted[PRICE_COLUMNS].mul(factor, axis=0)
+    return adjusted
+
+
+def slice_dates(df: pd.DataFrame, start=None, end=None) -> pd.DataFrame:
+    """
+    start is inclusive and end is exclusive, like yf.download.
+    """
+    if start is not None:
+        df = df[df.index >= pd.Timestamp(start)]
+
+    if end is not None:
+        df = df[df.index < pd.Timestamp(end)]
+
+    return df
+
+
+def load_ohlcv(
+    ticker: str,
+    start=None,
+    end=None,
+    *,
+    auto_adjust: bool = False,
+    max_age: float | None = REFRESH_SECONDS,
+) -> pd.DataFrame:
+    """
+    Daily OHLCV bars for one ticker, served from the local store.
+
+    Drop-in replacement for yf.download(ticker, start=..., end=...,
+    auto_adjust=...) with flat columns and a tz-naive DatetimeIndex.
+    """
+    df = refresh_ticker(ticker, max_age=max_age)
+    df = slice_dates(df, start, end)
+
+    if auto_adjust:
+        df = adjust_ohlc(df)
+
+    return df.copy()
+
+
+def load_close_matrix(
+    tickers: list[str],
+    start=None,
+    end=None,
+    *,
+    auto_adjust: bool = True,
+    max_age: float | None = REFRESH_SECONDS,
+) -> pd.DataFrame:
+    """
+    Close prices for a watchlist, one column per ticker, from one batched
+    refresh. Tickers without data are left out of the result.
+    """
+    histories = refresh_tickers(tickers, max_age=max_age)
+    columns = {}
+
+    for ticker, df in histories.items():
+        df = slice_dates(df, start, end)
+
+        if df.empty:
+            continue
+
+        if auto_adjust:
+            df = adjust_ohlc(df)
+
+        columns[ticker] = df["Close"]
+
+    if not columns:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name="Date"))
+
+    return pd.DataFrame(columns).sort_index()
+
+
+def load_ohlcv_batch(
+    tickers: list[str],
+    start=None,
+    end=None,
+    *,
+    auto_adjust: bool = False,
+    max_age: float | None = REFRESH_SECONDS,
+) -> dict[str, pd.DataFrame]:
+    """
+    Daily OHLCV bars for a watchlist, one frame per ticker (same layout as
+    load_ohlcv), from one batched refresh. Tickers without data are left
+    out of the result.
+    """
+    histories = refresh_tickers(tickers, max_age=max_age)
+    frames = {}
+
+    for ticker, df in histories.items():
+        df = slice_dates(df, start, end)
+
+        if df.empty:
+            continue
+
+        if auto_adjust:
+            df = adjust_ohlc(df)
+
+        frames[ticker] = df.copy()
+
+    return frames
@@ -0,0 +1,331 @@
+"""
+Put ladder optimizer
+--------------------
+Searches every 3- or 4-leg strike combination of a loaded put chain and,
+for each one, a grid of integer contract counts that fit in the total
+capital, and ranks the ladders by weighted CAGR subject to a maximum
+average assignment price.
+
+Ladder math matches the manual ladder on the option chain page:
+- Leg i's allocation target is floor(Capital * Allocation_i / (Strike_i * 100))
+  contracts. The search tries count_spread contracts either side of it
+  (never fewer than one contract per leg), so every leg is always held.
+- Unused capital is then spent greedily on extra contracts of the leg with
+  the highest premium / strike that still fits, but no leg goes above its
+  allocation target plus one contract, so the Allocation % split holds
+  to within one contract per leg. The result shows each leg's actual
+  weight of the used collateral.
+- Weighted Period Return = sum(Contracts * Premium) / sum(Contracts * Strike).
+- Avg Assignment Price = sum(Strike * Collateral) / sum(Collateral).
+
+Combinations are evaluated as (ladders x legs) arrays in chunks, one row
+per strike combination and contract count vector. Count vectors that do
+not fit in the capital, or that the greedy fill would turn into the same
+ladder as a neighbouring vector, are dropped before evaluation. Strikes below
+min_premium or above the capital are pruned, and so are combinations whose
+lowest strike is already above the target price. Chains with more than
+max_candidates usable strikes are thinned evenly. Ladders that end up with
+the same strikes and contracts are ranked once.
+"""
+
+from __future__ import annotations
+
+from itertools import combinations, islice, product
+
+import numpy as np
+import pandas as pd
+
+
+def candidate_puts(
+    strikes,
+    premiums,
+    stock_price: float,
+    total_capital: float,
+    max_candidates: int = 40,
+    min_premium: float = 0.01,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    OTM puts with at least min_premium that the capital can hold one
+    contract of, sorted by strike, highest first (Leg 1 = highest strike).
+
+    Dense chains are thinned to max_candidates strikes spread evenly over
+    the strike range, so far OTM strikes stay available for low targets.
+    """
+    strikes = np.asarray(strikes, dtype=float)
+    premiums = np.asarray(premiums, dtype=float)
+
+    keep = (
+        np.isfinite(strikes) & np.isfinite(premiums) &
+        (strikes > 0) & (premiums >= min_premium) &
+        (strikes < stock_price) &
+        (strikes * 100 <= total_capital)
+    )
+    strikes, premiums = strikes[keep], premiums[keep]
+
+    order = np.argsort(strikes)[::-1]
+    strikes, premiums = strikes[order], premiums[order]
+
+    if len(strikes) > max_candidates:
+        keep = np.unique(np.linspace(0, len(strikes) - 1, max_candidates).round().astype(int))
+        strikes, premiums = strikes[keep], premiums[keep]
+
+    return strikes, premiums
+
+
+def contract_grid(
+    K: np.ndarray,
+    allocations: np.ndarray,
+    total_capital: float,
+    count_spread: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Contract counts to try for each strike combination: every vector within
+    count_spread contracts of the allocation target per leg, shifted up
+    where needed so no leg goes below one contract, and never above the
+    leg's cap of target + 1 contracts. Vectors whose collateral exceeds the
+    capital are left out.
+
+    Returns the row of K each vector belongs to, the (rows, legs) counts,
+    the matching (rows, legs) caps and the largest count tried per leg.
+    """
+    n_legs = K.shape[1]
+    offsets = np.array(list(product(range(2 * count_spread + 1), repeat=n_legs)), dtype=float)
+
+    target = np.floor(total_capital * allocations[None, :] / (K * 100))
+    lowest = np.maximum(target - count_spread, 1)
+    cap = np.maximum(target + 1, lowest)
+    highest = np.minimum(lowest + 2 * count_spread, cap)
+
+    # (combinations, vectors) masks, before any vector is materialized.
+    in_grid = (offsets[None, :, :] <= (highest - lowest)[:, None, :]).all(axis=2)
+    collateral_per_contract = K * 100
+    collateral = (lowest * collateral_per_contract).sum(axis=1)[:, None] + collateral_per_contract @ offsets.T
+
+    rows, vectors = np.nonzero(in_grid & (collateral <= total_capital))
+    contracts = lowest[rows] + offsets[vectors]
+    return rows, contracts, cap[rows], highest[rows]
+
+
+def fill_duplicates(
+    K: np.ndarray,
+    P: np.ndarray,
+    contracts: np.ndarray,
+    total_capital: float,
+    max_contracts: np.ndarray,
+    highest: np.ndarray,
+) -> np.ndarray:
+    """
+    True for count vectors the greedy fill maps to the same ladder as the
+    vector with one more contract on the fill's first leg. That vector is
+    in the grid whenever the leg is still below the largest count tried:
+    the fill adds the same contract to it first and then proceeds
+    identically.
+    """
+    collateral_per_contract = K * 100
+    unused = total_capital - (contracts * collateral_per_contract).sum(axis=1)
+
+    fits = (collateral_per_contract <= unused[:, None]) & (contracts < max_contracts)
+    first_leg = np.argmax(np.where(fits, P / K, -np.inf), axis=1)
+    rows = np.arange(len(K))
+
+    return fits.any(axis=1) & (contracts[rows, first_leg] < highest[rows, first_leg])
+
+
+def evaluate_ladders(
+    K: np.ndarray,
+    P: np.ndarray,
+    contracts: np.ndarray,
+    total_capital: float,
+    max_contracts: np.ndarray,
+) -> dict[str, np.ndarray]:
+    """
+    Basket metrics for a batch of ladders after filling unused capital.
+    K, P, contracts and max_contracts are (ladders, legs) arrays of
+    strikes, premiums, starting contract counts and per-leg caps. Ladders
+    whose starting counts already exceed the capital come back with
+    negative unused capital.
+    """
+    collateral_per_contract = K * 100
+
+    contracts = contracts.copy()
+    unused = total_capital - (contracts * collateral_per_contract).sum(axis=1)
+
+    # Spend unused capital on the highest-yield leg that still fits below
+    # its cap, once per leg. Each pass fills its leg to the cap or until
+    # it no longer fits, so n_legs passes leave nothing that fits.
+    leg_yield = P / K
+    rows = np.arange(len(K))
+
+    for _ in range(K.shape[1]):
+        fits = (collateral_per_contract <= unused[:, None]) & (contracts < max_contracts)
+        best_leg = np.argmax(np.where(fits, leg_yield, -np.inf), axis=1)
+        any_fit = fits.any(axis=1)
+
+        best_collateral = collateral_per_contract[rows, best_leg]
+        room = max_contracts[rows, best_leg] - contracts[rows, best_leg]
+        extra = np.where(any_fit, np.minimum(np.floor(unused / best_collateral), room), 0)
+
+        contracts[rows, best_leg] += extra
+        unused -= extra * best_collateral
+
+    collateral = contracts * collateral_per_contract
+    total_collateral = collateral.sum(axis=1)
+    premium_cash = (contracts * P * 100).sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        period_return = premium_cash / total_collateral
+        avg_assignment = (collateral * K).sum(axis=1) / total_collateral
+
+    return {
+        "contracts": contracts,
+        "weights": collateral / total_collateral[:, None],
+        "unused": unused,
+        "total_collateral": total_collateral,
+        "premium_cash": premium_cash,
+        "period_return": period_return,
+        "avg_assignment": avg_assignment,
+    }
+
+
+def best_unique(K: np.ndarray, result: dict[str, np.ndarray], idx: np.ndarray, top_n: int) -> np.ndarray:
+    """
+    Rows of idx with the highest period return, at most top_n, keeping
+    one row per distinct (strikes, contracts) ladder.
+
+    Only the best few rows are sorted and compared; the prefix grows until
+    it holds top_n distinct ladders.
+    """
+    returns = result["period_return"][idx]
+    take = top_n
+
+    while True:
+        if take < len(idx):
+            best = idx[np.argpartition(-returns, take - 1)[:take]]
+        else:
+            best = idx
+
+        best = best[np.argsort(-result["period_return"][best], kind="stable")]
+
+        keys = np.hstack([K[best], result["contracts"][best]])
+        _, first = np.unique(keys, axis=0, return_index=True)
+
+        if len(first) >= top_n or len(best) == len(idx):
+            return best[np.sort(first)][:top_n]
+
+        take *= 4
+
+
+def optimize_put_ladder(
+    strikes,
+    premiums,
+    stock_price: float,
+    allocations,
+    total_capital: float,
+    dte: int,
+    target_avg_price: float,
+    max_candidates: int = 40,
+    top_n: int = 10,
+    count_spread: int = 1,
+    min_premium: float = 0.01,
+    chunk_size: int = 200_000,
+) -> pd.DataFrame:
+    """
+    Best ladders for the given allocation structure (3 or 4 legs),
+    highest weighted CAGR first.
+
+    allocations: Allocation % per leg, e.g. [10, 20, 30, 40].
+    target_avg_price: maximum allowed average assignment price.
+    count_spread: contracts searched either side of each leg's allocation
+    target; chunk_size bounds the ladders evaluated per batch.
+    """
+    allocations = np.asarray(allocations, dtype=float) / 100
+    n_legs = len(allocations)
+
+    K_all, P_all = candidate_puts(
+        strikes,
+        premiums,
+        stock_price=stock_price,
+        total_capital=total_capital,
+        max_candidates=max_candidates,
+        min_premium=min_premium,
+    )
+
+    if len(K_all) < n_legs:
+        return pd.DataFrame()
+
+    combos_per_chunk = max(1, chunk_size // (2 * count_spread + 1) ** n_legs)
+
+    best_blocks = []
+    combos_iter = combinations(range(len(K_all)), n_legs)
+
+    while True:
+        block = np.fromiter(
+            (i for combo in islice(combos_iter, combos_per_chunk) for i in combo),
+            dtype=np.int64,
+        ).reshape(-1, n_legs)
+
+        if len(block) == 0:
+            break
+
+        # Strikes are sorted high to low, so the last leg is the lowest.
+        # If even that strike is above target, no allocation can get the
+        # average assignment price down to target. One contract per leg
+        # must also fit in the capital.
+        block = block[
+            (K_all[block[:, -1]] <= target_avg_price) &
+            (K_all[block].sum(axis=1) * 100 <= total_capital)
+        ]
+
+        if len(block) == 0:
+            continue
+
+        rows, contracts, max_contracts, highest = contract_grid(
+            K_all[block], allocations, total_capital, count_spread
+        )
+        K = K_all[block[rows]]
+        P = P_all[block[rows]]
+
+        keep = ~fill_duplicates(K, P, contracts, total_capital, max_contracts, highest)
+        K, P, contracts, max_contracts = K[keep], P[keep], contracts[keep], max_contracts[keep]
+
+        result = evaluate_ladders(K, P, contracts, total_capital, max_contracts)
+
+        feasible = (
+            (result["unused"] >= 0) &
+            (result["contracts"] >= 1).all(axis=1) &
+            (result["avg_assignment"] <= target_avg_price)
+        )
+
+        if not feasible.any():
+            continue
+
+        idx = best_unique(K, result, np.flatnonzero(feasible), top_n)
+
+        best_blocks.append({
+            "K": K[idx],
+            "P": P[idx],
+            **{key: value[idx] for key, value in result.items()},
+        })
+
+    if not best_blocks:
+        return pd.DataFrame()
+
+    merged = {key: np.concatenate([b[key] for b in best_blocks]) for key in best_blocks[0]}
+    order = best_unique(merged["K"], merged, np.arange(len(merged["K"])), top_n)
+
+    table = {}
+    for leg in range(n_legs):
+        table[f"Strike {leg + 1}"] = merged["K"][order, leg]
+        table[f"Premium {leg + 1}"] = merged["P"][order, leg]
+        table[f"Contracts {leg + 1}"] = merged["contracts"][order, leg].astype(int)
+        table[f"Weight {leg + 1} %"] = merged["weights"][order, leg] * 100
+
+    period_return = merged["period_return"][order]
+
+    table["Used Collateral"] = merged["total_collateral"][order]
+    table["Premium Cash"] = merged["premium_cash"][order]
+    table["Weighted Period Return %"] = period_return * 100
+    table["Weighted CAGR %"] = ((1 + period_return) ** (365 / dte) - 1) * 100
+    table["Avg Assignment Price"] = merged["avg_assignment"][order]
+
+    return pd.DataFrame(table)
@@ -0,0 +1,119 @@
+"""
+Put credit spread search
+------------------------
+Enumerates every (short put, long put) pair of one expiration in a single
+vectorized pass and returns them as a ranked table.
+
+With a width list, each short strike is matched to "short - width" by a
+binary search over the sorted long strikes (O(n log n) per width), with a
+small tolerance so non-integer strike grids (2.5, 0.5, ...) still match.
+Without a width list every long strike below the short strike is used.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+SPREAD_COLUMNS = [
+    "Short Strike",
+    "Long Strike",
+    "Width",
+    "Net Credit",
+    "Max Loss",
+    "Return on Risk",
+    "Break-even",
+    "Probability OTM",
+]
+
+
+def match_strikes(targets: np.ndarray, strikes: np.ndarray, rel_tol: float = 1e-6) -> np.ndarray:
+    """
+    Index into sorted strikes of the strike equal to each target, or -1.
+    """
+    if len(strikes) == 0:
+        return np.full(targets.shape, -1)
+
+    right = np.clip(np.searchsorted(strikes, targets), 0, len(strikes) - 1)
+    left = np.clip(right - 1, 0, len(strikes) - 1)
+
+    nearest = np.where(
+        np.abs(strikes[left] - targets) <= np.abs(strikes[right] - targets),
+        left,
+        right,
+    )
+
+    tol = rel_tol * np.maximum(np.abs(targets), 1.0)
+    return np.where(np.abs(strikes[nearest] - targets) <= tol, nearest, -1)
+
+
+def put_credit_spreads(
+    short_puts: pd.DataFrame,
+    long_puts: pd.DataFrame | None = None,
+    widths=None,
+    price_col: str = "OPM",
+    p_otm_col: str = "P(OTM)",
+) -> pd.DataFrame:
+    """
+    All put credit spreads, best Return on Risk first.
+
+    short_puts: candidate short legs (e.g. already filtered by P(OTM)).
+    long_puts: candidate long legs, defaults to short_puts.
+    widths: spread widths to consider, or None for every strike pair.
+
+    Return on Risk and Probability OTM are in percent. Spreads without a
+    positive credit and a positive max loss are dropped.
+    """
+    long_puts = short_puts if long_puts is None else long_puts
+
+    shorts = short_puts.dropna(subset=["strike", price_col])
+    longs = (
+        long_puts.dropna(subset=["strike", price_col])
+        .drop_duplicates(subset="strike")
+        .sort_values("strike")
+    )
+
+    short_strike = shorts["strike"].to_numpy(dtype=float)
+    short_price = shorts[price_col].to_numpy(dtype=float)
+    short_p_otm = shorts[p_otm_col].to_numpy(dtype=float)
+
+    long_strike = longs["strike"].to_numpy(dtype=float)
+    long_price = longs[price_col].to_numpy(dtype=float)
+
+    if widths is None:
+        short_idx, long_idx = np.nonzero(long_strike[None, :] < short_strike[:, None])
+    else:
+        widths = np.unique(np.asarray(widths, dtype=float))
+        targets = (short_strike[:, None] - widths[None, :]).ravel()
+
+        matched = match_strikes(targets, long_strike)
+        found = matched >= 0
+
+        short_idx = np.repeat(np.arange(len(short_strike)), len(widths))[found]
+        long_idx = matched[found]
+
+    width = short_strike[short_idx] - long_strike[long_idx]
+    net_credit = short_price[short_idx] - long_price[long_idx]
+    max_loss = width - net_credit
+
+    keep = (width > 0) & (net_credit > 0) & (max_loss > 0)
+    short_idx, long_idx = short_idx[keep], long_idx[keep]
+    width, net_credit, max_loss = width[keep], net_credit[keep], max_loss[keep]
+
+    spreads = pd.DataFrame({
+        "Short Strike": short_strike[short_idx],
+        "Long Strike": long_strike[long_idx],
+        "Width": width,
+        "Net Credit": net_credit,
+        "Max Loss": max_loss,
+        "Return on Risk": net_credit / max_loss * 100,
+        "Break-even": short_strike[short_idx] - net_credit,
+        "Probability OTM": short_p_otm[short_idx] * 100,
+    }, columns=SPREAD_COLUMNS)
+
+    return spreads.sort_values(
+        ["Return on Risk", "Probability OTM"],
+        ascending=False,
+        ignore_index=True,
+    )
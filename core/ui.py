@@ -0,0 +1,31 @@
+"""
+Streamlit helpers
+-----------------
+The few Streamlit shims shared by the pages; the rest of core/ does not
+import Streamlit.
+
+- fragment: st.fragment, or st.experimental_fragment on older Streamlit
+  releases. Use it bare (@fragment) or with options
+  (@fragment(run_every=0.5)). Without either, the function runs as part
+  of the full page and run_every is ignored; FRAGMENTS tells the page
+  which case it is in.
+"""
+
+from __future__ import annotations
+
+import streamlit as st
+
+
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+FRAGMENTS = _fragment is not None
+
+
+def fragment(func=None, *, run_every=None):
+    if _fragment is None:
+        return func if func is not None else (lambda f: f)
+
+    if func is None:
+        return _fragment(run_every=run_every)
+
+    return _fragment(func, run_every=run_every)
@@ -2,11 +2,12 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-import yfinance as yf
 import seaborn as sns
 import streamlit as st
 import plotly.graph_objects as go
 
+from core.price_store import load_ohlcv
+
 # Set the app title 
 st.title('Anomaly Detection Stock Market App')
 st.write('Welcome to my Anomaly detection app!')
@@ -18,19 +19,15 @@ widgetuser_input = st.text_input('Enter a ticker based on Yahoo Finance:', 'SPY'
 start_date = st.date_input('Start Date', value=pd.to_datetime('2025-01-01'))
 end_date = st.date_input('End Date', value=pd.Timestamp.now())
 
-# Download data from Yahoo Finance
+# Load data from the local price store (Yahoo Finance)
 symbol = widgetuser_input
-spy = yf.download(symbol, start=start_date, end=end_date)
+spy = load_ohlcv(symbol, start=start_date, end=end_date, auto_adjust=True)
 
 # Defensive check
 if spy.empty:
     st.error("No data was downloaded. Please check the ticker or date range.")
     st.stop()
 
-# Verify and flatten multi-level indexes
-if isinstance(spy.columns, pd.MultiIndex):
-    spy.columns = spy.columns.get_level_values(0)
-
 # ================================
 # Diff Z-Score 22 Days Section
 # ================================
@@ -218,17 +215,13 @@ end_date_sp500 = pd.Timestamp.now()
 
 # Download the data for the specified ticker symbol
 symbol = st.text_input("Enter a ticker symbol:", "SPY")
-sp500_data = yf.download(symbol, start=start_date_sp500, end=end_date_sp500)
+sp500_data = load_ohlcv(symbol, start=start_date_sp500, end=end_date_sp500, auto_adjust=True)
 
 # Defensive check
 if sp500_data.empty:
     st.error("No monthly data was downloaded. Please check the ticker symbol.")
     st.stop()
 
-# Flatten multi-level columns if needed
-if isinstance(sp500_data.columns, pd.MultiIndex):
-    sp500_data.columns = sp500_data.columns.get_level_values(0)
-
 # Ensure the data is sorted by date
 sp500_data.sort_index(inplace=True)
 
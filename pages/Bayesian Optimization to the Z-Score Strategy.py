@@ -1,15 +1,16 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import matplotlib.pyplot as plt
 from bayes_opt import BayesianOptimization
 
+from core.price_store import load_close_matrix, load_ohlcv
+
 # Streamlit configuration for user inputs
 st.title("Investment Strategy Comparison")
 
 # User input fields
 spy = st.text_input("Enter the ticker for SPY (S&P 500 ETF):", "QQQ")
-sector_etfs = st.text_input("Enter sector ETF tickers separated by commas:", "IXN,QQQ").split(',')
+sector_etfs = [t.strip().upper() for t in st.text_input("Enter sector ETF tickers separated by commas:", "IXN,QQQ").split(',') if t.strip()]
 initial_cash = st.number_input("Enter initial cash investment:", min_value=1000, value=10000, step=500)
 years = st.number_input("Enter the number of years for annual return calculation:", min_value=1, value=17, step=1)
 
@@ -17,10 +18,11 @@ years = st.number_input("Enter the number of years for annual return calculation
 months = years * 12
 monthly_investment = initial_cash / months
 
-# Function to fetch data from Yahoo Finance
+# Function to fetch adjusted closes from the local price store (Yahoo Finance)
 def fetch_data(tickers, start_date, end_date):
-    data = yf.download(tickers, start=start_date, end=end_date, interval='1d')['Adj Close']
-    return data
+    if isinstance(tickers, str):
+        return load_ohlcv(tickers, start=start_date, end=end_date)['Adj Close']
+    return load_close_matrix(tickers, start=start_date, end=end_date, auto_adjust=True)
 
 # Fetch data
 start_date = '2007-01-01'
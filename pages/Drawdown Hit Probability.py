@@ -1,8 +1,24 @@
 # app.py
-import numpy as np
+import io
+import os
+
 import pandas as pd
-import yfinance as yf
 import streamlit as st
+import matplotlib.pyplot as plt
+
+from core.drawdown import (
+    BASE_MODES,
+    BOOTSTRAP_BLOCK,
+    BOOTSTRAP_REPLICATES,
+    CURVE_THRESHOLDS,
+    base_price,
+    bootstrap_hit_probabilities,
+    drawdown_cube,
+    drawdowns,
+    hit_probabilities,
+    survival_curves,
+)
+from core.price_store import load_ohlcv, load_ohlcv_batch
 
 st.set_page_config(page_title="Drawdown Hit Probability", layout="wide")
 
@@ -17,13 +33,26 @@ st.write(
 # -----------------------------
 st.sidebar.header("Inputs")
 
-ticker = st.sidebar.text_input("Ticker", value="SPY").strip().upper()
+mode = st.sidebar.radio("Mode", ["Single ticker", "Batch (ticker list)"])
+
+if mode == "Single ticker":
+    ticker = st.sidebar.text_input("Ticker", value="SPY").strip().upper()
+else:
+    ticker_input = st.sidebar.text_area("Tickers separated by commas", value="SPY,QQQ,IWM,DIA,XLK,XLF")
+    batch_tickers = list(dict.fromkeys(t.strip().upper() for t in ticker_input.split(",") if t.strip()))
+    batch_workers = st.sidebar.slider(
+        "Worker processes",
+        min_value=1,
+        max_value=max(os.cpu_count() or 1, 2),
+        value=1,
+        help="Each ticker's table takes milliseconds, so extra processes only pay off for long lists."
+    )
 start_date = st.sidebar.text_input("Start date (YYYY-MM-DD)", value="2008-01-01").strip()
 
 default_horizons = [1, 3, 5, 10, 15, 20, 25, 30]
 horizons = st.sidebar.multiselect(
     "Horizons (trading days)",
-    options=list(range(1, 61)),
+    options=list(range(1, 251)),
     default=default_horizons
 )
 horizons = sorted(set(horizons))
@@ -38,7 +67,7 @@ thresholds = sorted([x / 100.0 for x in set(thresholds_pct)])
 
 base_mode = st.sidebar.selectbox(
     "Base definition",
-    options=["(High + Low) / 2", "Close", "Low + alpha*(High-Low)"],
+    options=BASE_MODES,
     index=0
 )
 
@@ -46,6 +75,26 @@ alpha = 0.5
 if base_mode == "Low + alpha*(High-Low)":
     alpha = st.sidebar.slider("alpha", min_value=0.0, max_value=1.0, value=0.5, step=0.05)
 
+bootstrap = st.sidebar.checkbox(
+    "Bootstrap confidence bands",
+    value=False,
+    help="Stationary block bootstrap of start days; overlapping windows make the table's observations far from independent."
+)
+
+if bootstrap:
+    n_replicates = st.sidebar.number_input("Bootstrap replicates", min_value=100, max_value=5000, value=BOOTSTRAP_REPLICATES, step=100)
+    mean_block = st.sidebar.slider("Mean block length (days)", min_value=1, max_value=250, value=BOOTSTRAP_BLOCK)
+    confidence = st.sidebar.selectbox("Confidence level", [0.80, 0.90, 0.95, 0.99], index=1, format_func=lambda x: f"{x:.0%}")
+
+first_breach = st.sidebar.checkbox(
+    "Time to first breach (survival curves)",
+    value=False,
+    help="Kaplan-Meier curves of the days until the future Low first crosses each threshold."
+)
+
+if first_breach:
+    survival_days = st.sidebar.slider("Survival curve length (days)", min_value=20, max_value=1000, value=250, step=10)
+
 run = st.sidebar.button("Run")
 
 # -----------------------------
@@ -53,8 +102,23 @@ run = st.sidebar.button("Run")
 # -----------------------------
 @st.cache_data(show_spinner=False, ttl=3600)
 def download_ohlc(ticker_: str, start_: str) -> pd.DataFrame:
-    df = yf.download(ticker_, start=start_, auto_adjust=True, progress=False)
-    return df
+    return load_ohlcv(ticker_, start=start_, auto_adjust=True)
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def download_ohlc_batch(tickers_: tuple[str, ...], start_: str) -> dict[str, pd.DataFrame]:
+    return load_ohlcv_batch(list(tickers_), start=start_, auto_adjust=True)
+
+def cube_heatmap(view: pd.DataFrame, xlabel: str, title: str):
+    """Tickers down the rows, hit probability (%) as colour."""
+    fig, ax = plt.subplots(figsize=(max(6, 0.6 * view.shape[1] + 3), max(3, 0.35 * view.shape[0] + 1.5)))
+    image = ax.imshow(view.to_numpy(), aspect="auto", cmap="Reds", vmin=0, vmax=100)
+    ax.set_xticks(range(view.shape[1]), view.columns, rotation=45, ha="right")
+    ax.set_yticks(range(view.shape[0]), view.index)
+    ax.set_xlabel(xlabel)
+    ax.set_title(title)
+    fig.colorbar(image, ax=ax, label="Hit probability (%)")
+    fig.tight_layout()
+    return fig
 
 def get_col(df: pd.DataFrame, col: str, ticker_: str) -> pd.Series:
     if isinstance(df.columns, pd.MultiIndex):
@@ -70,52 +134,107 @@ def get_col(df: pd.DataFrame, col: str, ticker_: str) -> pd.Series:
         raise RuntimeError(f"Could not find {col} in columns: {df.columns}")
     return df[col]
 
-def compute_table(df: pd.DataFrame, ticker_: str, horizons_: list[int], thresholds_: list[float], base_mode_: str, alpha_: float):
+def aligned_bars(df: pd.DataFrame, ticker_: str):
     high = get_col(df, "High", ticker_).dropna().astype(float)
     low  = get_col(df, "Low",  ticker_).dropna().astype(float)
     close = get_col(df, "Close", ticker_).dropna().astype(float)
 
     idx = high.index.intersection(low.index).intersection(close.index)
-    high = high.loc[idx]
-    low = low.loc[idx]
-    close = close.loc[idx]
-
-    if base_mode_ == "(High + Low) / 2":
-        base = (high + low) * 0.5
-    elif base_mode_ == "Close":
-        base = close
-    else:
-        # Low + alpha*(High-Low)
-        base = low + alpha_ * (high - low)
-
-    horizon_labels = [f"{h} days" for h in horizons_]
-    threshold_labels = [f"{int(round(x * 100))}%" for x in thresholds_]
-
-    result = np.zeros((len(horizons_), len(thresholds_)), dtype=float)
-    window_counts = []
-
-    for i, h in enumerate(horizons_):
-        future_lows = pd.concat([low.shift(-k) for k in range(1, h + 1)], axis=1)
-        min_future_low = future_lows.min(axis=1)
+    return high.loc[idx], low.loc[idx], close.loc[idx]
 
-        mask = min_future_low.notna() & base.notna()
-        min_future_low = min_future_low[mask]
-        base_valid = base[mask]
+def compute_table(df: pd.DataFrame, ticker_: str, horizons_: list[int], thresholds_: list[float], base_mode_: str, alpha_: float):
+    high, low, close = aligned_bars(df, ticker_)
+    idx = low.index
 
-        window_counts.append(int(mask.sum()))
+    base = base_price(high, low, close, base_mode_, alpha_)
 
-        drawdown = (min_future_low / base_valid) - 1.0
+    horizon_labels = [f"{h} days" for h in horizons_]
+    threshold_labels = [f"{int(round(x * 100))}%" for x in thresholds_]
 
-        for j, thr in enumerate(thresholds_):
-            result[i, j] = (drawdown <= -thr).mean() * 100.0
+    # Forward window minima for every horizon from one range-min structure
+    drawdown = drawdowns(low.to_numpy(), base.to_numpy(), horizons_)
+    result, window_counts = hit_probabilities(drawdown, thresholds_)
 
     table = pd.DataFrame(result, index=horizon_labels, columns=threshold_labels)
-    return table, window_counts, (idx.min().date(), idx.max().date())
+
+    # Continuous threshold curve from the same sorted drawdowns
+    curve_values, _ = hit_probabilities(drawdown, CURVE_THRESHOLDS)
+    curve = pd.DataFrame(
+        curve_values.T,
+        index=pd.Index(CURVE_THRESHOLDS * 100.0, name="Threshold (%)"),
+        columns=horizon_labels,
+    )
+    return table, curve, drawdown, [int(c) for c in window_counts], (idx.min().date(), idx.max().date())
 
 # -----------------------------
 # Run
 # -----------------------------
-if run:
+if mode == "Batch (ticker list)":
+    if run:
+        if not batch_tickers:
+            st.error("Please enter at least one ticker.")
+            st.stop()
+        if not horizons or not thresholds:
+            st.error("Please select at least one horizon and one threshold.")
+            st.stop()
+
+        with st.spinner("Downloading data..."):
+            frames = download_ohlc_batch(tuple(batch_tickers), start_date)
+
+        missing = [t for t in batch_tickers if t not in frames]
+        if missing:
+            st.warning("No data returned for: " + ", ".join(missing))
+        if not frames:
+            st.stop()
+
+        with st.spinner(f"Computing tables for {len(frames)} tickers..."):
+            st.session_state.drawdown_cube = drawdown_cube(
+                frames, horizons, thresholds, base_mode, alpha, workers=batch_workers
+            )
+
+    cube = st.session_state.get("drawdown_cube")
+
+    if cube is None:
+        st.info("Enter a ticker list on the left and click **Run**.")
+        st.stop()
+
+    cube_tickers = list(cube.index.unique("ticker"))
+    cube_horizons = list(cube.index.unique("horizon"))
+    cube_thresholds = list(cube.index.unique("threshold"))
+    probability = cube["hit_probability"]
+
+    st.subheader(f"{len(cube_tickers)} tickers")
+
+    # Compare tickers at one horizon across thresholds
+    view_horizon = st.selectbox("Horizon (trading days)", cube_horizons, index=len(cube_horizons) - 1)
+    by_threshold = probability.xs(view_horizon, level="horizon").unstack("threshold")
+    by_threshold.columns = [f"{x * 100:g}%" for x in by_threshold.columns]
+    st.pyplot(cube_heatmap(by_threshold, "Threshold", f"Hit probability within {view_horizon} days"))
+
+    # Compare tickers at one threshold across horizons
+    view_threshold = st.selectbox(
+        "Threshold",
+        cube_thresholds,
+        index=len(cube_thresholds) // 2,
+        format_func=lambda x: f"{x * 100:g}%"
+    )
+    by_horizon = probability.xs(view_threshold, level="threshold").unstack("horizon")
+    by_horizon.columns = [f"{h} days" for h in by_horizon.columns]
+    st.pyplot(cube_heatmap(by_horizon, "Horizon", f"Probability of a {view_threshold * 100:g}% drawdown"))
+
+    with st.expander("Full (ticker, horizon, threshold) table"):
+        st.dataframe(cube, use_container_width=True)
+
+    buffer = io.BytesIO()
+    cube.reset_index().to_parquet(buffer, index=False)
+    st.download_button(
+        "Download cube as Parquet",
+        data=buffer.getvalue(),
+        file_name="drawdown_cube.parquet",
+        mime="application/octet-stream"
+    )
+
+elif run:
     if not horizons:
         st.error("Please select at least one horizon.")
         st.stop()
@@ -131,7 +250,7 @@ if run:
         st.stop()
 
     with st.spinner("Computing table..."):
-        table, counts, (dmin, dmax) = compute_table(df, ticker, horizons, thresholds, base_mode, alpha)
+        table, curve, drawdown, counts, (dmin, dmax) = compute_table(df, ticker, horizons, thresholds, base_mode, alpha)
 
     st.subheader(f"Ticker: {ticker}")
     st.caption(f"Data range used: {dmin} → {dmax}")
@@ -144,6 +263,49 @@ if run:
     # Show as numbers (percent)
     st.dataframe(table.style.format("{:.2f}%"), use_container_width=True)
 
+    if bootstrap:
+        with st.spinner("Bootstrapping..."):
+            band_low, band_high = bootstrap_hit_probabilities(
+                drawdown, thresholds, int(n_replicates), mean_block, confidence
+            )
+
+        bands = pd.DataFrame(
+            [[f"{p:.2f}% ({lo:.2f}–{hi:.2f})" for p, lo, hi in zip(*row)]
+             for row in zip(table.to_numpy(), band_low, band_high)],
+            index=table.index,
+            columns=table.columns,
+        )
+        st.markdown(f"### {confidence:.0%} bootstrap bands ({int(n_replicates)} replicates, mean block {mean_block} days)")
+        st.dataframe(bands, use_container_width=True)
+
+    # Hit probability for every threshold from 0.5% to 50%
+    st.markdown("### Hit probability by threshold")
+    st.line_chart(curve)
+
+    if first_breach:
+        high, low, close = aligned_bars(df, ticker)
+        base = base_price(high, low, close, base_mode, alpha)
+        survival = survival_curves(low.to_numpy(), base.to_numpy(), thresholds, survival_days)
+        survival.columns = table.columns
+
+        st.markdown("### Time to first breach")
+        st.caption(
+            "Kaplan-Meier share of start days whose future Low has not yet crossed "
+            "`base[t] · (1 − X%)` after each number of trading days. "
+            "Start days near the end of the data are censored instead of dropped."
+        )
+        st.line_chart(survival * 100.0)
+
+        reached = survival <= 0.5
+        median_days = pd.DataFrame({
+            "Median days to breach": [
+                int(survival.index[reached[c].to_numpy()][0]) if reached[c].any() else None
+                for c in survival.columns
+            ],
+            f"Hit within {survival_days} days (%)": (1.0 - survival.iloc[-1]) * 100.0,
+        }, index=survival.columns)
+        st.dataframe(median_days, use_container_width=True)
+
     # Window counts
     counts_df = pd.DataFrame({"Horizon": [f"{h} days" for h in horizons], "Windows used": counts})
     st.markdown("### Rolling window counts")
@@ -1,9 +1,23 @@
-import yfinance as yf
+import os
+
 import numpy as np
 import pandas as pd
 import streamlit as st
 import matplotlib.pyplot as plt
 
+from core.frontier import (
+    bin_cloud,
+    efficient_frontier,
+    long_only_max_sharpe,
+    long_only_min_variance,
+    min_variance_weights,
+    portfolio_stats,
+    simulate_portfolios,
+    tangency_weights,
+    walk_forward_backtest,
+)
+from core.price_store import load_close_matrix
+
 # Streamlit setup
 st.title("Efficient Frontier Portfolio Optimization")
 
@@ -37,10 +51,35 @@ if start_date >= end_date:
     st.stop()
 
 # Portfolio settings
+method = st.sidebar.radio(
+    "Optimization method",
+    ["Exact (QP solver)", "Random simulation"],
+    help="The solver finds the exact long-only max Sharpe / min volatility portfolios and frontier."
+)
+
+show_cloud = method == "Random simulation" or st.sidebar.checkbox(
+    "Show random portfolio cloud",
+    value=False
+)
+
+cloud_render = st.sidebar.radio(
+    "Cloud rendering",
+    ["Binned image", "Scatter"],
+    help="Binned image draws the max Sharpe ratio per cell of a grid, so its cost does not depend on the number of portfolios."
+)
+
+cloud_bins = st.sidebar.slider(
+    "Cloud grid size",
+    min_value=50,
+    max_value=800,
+    value=300,
+    step=50
+)
+
 num_portfolios = st.sidebar.number_input(
     "Number of simulated portfolios",
     min_value=1000,
-    max_value=200000,
+    max_value=1000000,
     value=100000,
     step=1000
 )
@@ -54,28 +93,40 @@ risk_free_rate = st.sidebar.number_input(
     format="%.2f"
 )
 
+# Walk-forward backtest settings
+st.sidebar.header("Walk-Forward Backtest")
+
+run_backtest = st.sidebar.checkbox("Run walk-forward backtest", value=False)
+
+window_months = st.sidebar.slider(
+    "Estimation window (months)",
+    min_value=3,
+    max_value=60,
+    value=12
+)
+
+backtest_workers = st.sidebar.slider(
+    "Worker processes",
+    min_value=1,
+    max_value=max(os.cpu_count() or 1, 2),
+    value=1
+)
+
 # Download historical data
 st.write("Downloading historical price data...")
 
 try:
-    downloaded_data = yf.download(
+    data = load_close_matrix(
         tickers,
         start=start_date,
         end=end_date,
-        auto_adjust=True,
-        progress=False
+        auto_adjust=True
     )
 
-    if downloaded_data.empty:
+    if data.empty:
         st.error("No data was downloaded. Please check the tickers or date range.")
         st.stop()
 
-    # Handle single ticker and multiple ticker cases
-    if len(tickers) == 1:
-        data = downloaded_data["Close"].to_frame(name=tickers[0])
-    else:
-        data = downloaded_data["Close"]
-
 except Exception as e:
     st.error(f"Error downloading data: {e}")
     st.stop()
@@ -115,58 +166,57 @@ if returns.empty:
 annual_returns = returns.mean() * 252
 cov_matrix = returns.cov() * 252
 
-# Portfolio simulation
-results = np.zeros((3, int(num_portfolios)))
-weights_record = []
-
-for i in range(int(num_portfolios)):
-    # Generate random weights
-    weights = np.random.random(len(tickers))
-    weights /= np.sum(weights)
-
-    weights_record.append(weights)
-
-    # Expected portfolio return
-    portfolio_return = np.dot(weights, annual_returns)
-
-    # Expected portfolio volatility
-    portfolio_volatility = np.sqrt(
-        np.dot(weights.T, np.dot(cov_matrix, weights))
+# Cached on its inputs, so unrelated sidebar changes do not rerun the
+# backtest or start a new process pool.
+@st.cache_data(show_spinner=False, max_entries=4)
+def run_backtest_cached(returns, window, risk_free_rate, workers):
+    return walk_forward_backtest(
+        returns,
+        window=window,
+        risk_free_rate=risk_free_rate,
+        workers=workers
     )
 
-    # Sharpe ratio
-    if portfolio_volatility == 0:
-        sharpe_ratio = 0
-    else:
-        sharpe_ratio = (portfolio_return - risk_free_rate) / portfolio_volatility
-
-    # Store results
-    results[0, i] = portfolio_volatility
-    results[1, i] = portfolio_return
-    results[2, i] = sharpe_ratio
-
-# Convert results to DataFrame
-results_df = pd.DataFrame(
-    results.T,
-    columns=["Volatility", "Return", "Sharpe Ratio"]
-)
-
-weights_df = pd.DataFrame(weights_record, columns=tickers)
+def portfolio_row(weights):
+    """Volatility, Return and Sharpe Ratio of one weight vector."""
+    ret, vol, sharpe = portfolio_stats(weights, annual_returns, cov_matrix, risk_free_rate)
+    return pd.Series({"Volatility": vol[0], "Return": ret[0], "Sharpe Ratio": sharpe[0]})
+
+# Exact long-only frontier (always drawn)
+frontier_df, _ = efficient_frontier(annual_returns, cov_matrix)
+
+# Portfolio simulation (vectorized in batches)
+if show_cloud:
+    results_df, weights = simulate_portfolios(
+        annual_returns,
+        cov_matrix,
+        int(num_portfolios),
+        risk_free_rate
+    )
 
-# Find the portfolio with the maximum Sharpe Ratio
-max_sharpe_idx = results_df["Sharpe Ratio"].idxmax()
-max_sharpe_portfolio = results_df.loc[max_sharpe_idx]
-max_sharpe_weights = weights_df.loc[max_sharpe_idx]
+if method == "Random simulation":
+    # Find the portfolio with the maximum Sharpe Ratio
+    max_sharpe_idx = results_df["Sharpe Ratio"].idxmax()
+    max_sharpe_portfolio = results_df.loc[max_sharpe_idx]
+    max_sharpe_weights = pd.Series(weights[max_sharpe_idx], index=tickers, dtype=float)
+
+    # Find the portfolio with the minimum volatility
+    min_vol_idx = results_df["Volatility"].idxmin()
+    min_vol_portfolio = results_df.loc[min_vol_idx]
+    min_vol_weights = pd.Series(weights[min_vol_idx], index=tickers, dtype=float)
+else:
+    min_vol_weights = pd.Series(long_only_min_variance(cov_matrix), index=tickers)
+    min_vol_portfolio = portfolio_row(min_vol_weights.values)
+
+    best = long_only_max_sharpe(annual_returns, cov_matrix, risk_free_rate)
+    if best is None:
+        st.warning("No asset beats the risk-free rate; showing the minimum volatility portfolio as max Sharpe.")
+        best = min_vol_weights.values
+    max_sharpe_weights = pd.Series(best, index=tickers)
+    max_sharpe_portfolio = portfolio_row(max_sharpe_weights.values)
 
 # Sort weights by magnitude
 max_sharpe_weights_sorted = max_sharpe_weights.sort_values(ascending=False)
-
-# Find the portfolio with the minimum volatility
-min_vol_idx = results_df["Volatility"].idxmin()
-min_vol_portfolio = results_df.loc[min_vol_idx]
-min_vol_weights = weights_df.loc[min_vol_idx]
-
-# Sort weights by magnitude
 min_vol_weights_sorted = min_vol_weights.sort_values(ascending=False)
 
 # Plot Efficient Frontier
@@ -174,15 +224,52 @@ st.subheader("Efficient Frontier")
 
 fig, ax = plt.subplots(figsize=(10, 7))
 
-scatter = ax.scatter(
-    results_df["Volatility"],
-    results_df["Return"],
-    c=results_df["Sharpe Ratio"],
-    cmap="viridis",
-    alpha=0.7
-)
+if show_cloud and cloud_render == "Binned image":
+    cloud = bin_cloud(
+        results_df["Volatility"],
+        results_df["Return"],
+        results_df["Sharpe Ratio"],
+        bins=cloud_bins
+    )
+
+    image = ax.imshow(
+        cloud["grid"],
+        origin="lower",
+        aspect="auto",
+        extent=cloud["extent"],
+        cmap="viridis",
+        interpolation="nearest"
+    )
+
+    fig.colorbar(image, ax=ax, label="Max Sharpe Ratio in Cell")
+
+    ax.plot(
+        cloud["envelope_volatility"],
+        cloud["envelope_return"],
+        color="grey",
+        linestyle="--",
+        linewidth=1,
+        label="Simulated Envelope"
+    )
+
+elif show_cloud:
+    scatter = ax.scatter(
+        results_df["Volatility"],
+        results_df["Return"],
+        c=results_df["Sharpe Ratio"],
+        cmap="viridis",
+        alpha=0.7
+    )
 
-fig.colorbar(scatter, ax=ax, label="Sharpe Ratio")
+    fig.colorbar(scatter, ax=ax, label="Sharpe Ratio")
+
+ax.plot(
+    frontier_df["Volatility"],
+    frontier_df["Return"],
+    color="black",
+    linewidth=2,
+    label="Efficient Frontier (long-only)"
+)
 
 ax.scatter(
     max_sharpe_portfolio["Volatility"],
@@ -241,6 +328,46 @@ min_vol_display = pd.DataFrame({
 
 st.dataframe(min_vol_display, use_container_width=True)
 
+# Walk-forward backtest: monthly rebalancing, out-of-sample value
+if run_backtest:
+    st.subheader("Walk-Forward Backtest (Monthly Rebalancing)")
+
+    values_df, rebalance_weights = run_backtest_cached(
+        returns,
+        window_months * 21,
+        risk_free_rate,
+        backtest_workers
+    )
+
+    if values_df.empty:
+        st.warning("Not enough history for the selected estimation window.")
+    else:
+        st.line_chart(values_df)
+
+        daily = values_df.pct_change().dropna()
+        years = len(daily) / 252
+
+        backtest_stats = pd.DataFrame({
+            "CAGR (%)": ((values_df.iloc[-1] / values_df.iloc[0]) ** (1 / years) - 1) * 100,
+            "Volatility (%)": daily.std() * np.sqrt(252) * 100,
+            "Sharpe Ratio": (daily.mean() * 252 - risk_free_rate) / (daily.std() * np.sqrt(252)),
+            "Max Drawdown (%)": (values_df / values_df.cummax() - 1).min() * 100,
+        })
+
+        st.dataframe(backtest_stats, use_container_width=True)
+
+        st.write("Max Sharpe weights at each rebalance date")
+        st.area_chart(rebalance_weights)
+
+# Analytic portfolios without the long-only constraint
+with st.expander("Unconstrained portfolios (short sales allowed)"):
+    unconstrained = pd.DataFrame({
+        "Min Variance (%)": min_variance_weights(cov_matrix) * 100,
+        "Tangency (%)": tangency_weights(annual_returns, cov_matrix, risk_free_rate) * 100,
+    }, index=tickers)
+
+    st.dataframe(unconstrained, use_container_width=True)
+
 # Optional raw price data
 with st.expander("Show historical price data"):
     st.dataframe(data, use_container_width=True)
@@ -32,7 +32,8 @@ import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
-import yfinance as yf
+
+from core.price_store import load_ohlcv
 
 
 st.set_page_config(
@@ -59,16 +60,14 @@ def load_yahoo_close(
     column_name: str,
 ) -> pd.DataFrame:
     """
-    Download stock/index close price from Yahoo Finance.
+    Load stock/index close price from the local price store (Yahoo Finance).
     """
 
-    df = yf.download(
+    df = load_ohlcv(
         ticker,
         start=start,
         end=end + dt.timedelta(days=1),
         auto_adjust=True,
-        progress=False,
-        threads=False,
     )
 
     if df.empty:
@@ -77,13 +76,7 @@ def load_yahoo_close(
             "Try another ticker. For example, use RSP if ^SPXEW fails."
         )
 
-    if isinstance(df.columns, pd.MultiIndex):
-        close = df["Close"].iloc[:, 0]
-    else:
-        close = df["Close"]
-
-    out = close.rename(column_name).to_frame()
-    out.index = pd.to_datetime(out.index).tz_localize(None)
+    out = df["Close"].rename(column_name).to_frame()
     out = out.dropna()
 
     if out.empty:
@@ -3,9 +3,14 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import datetime as dt
-import yfinance as yf
 from scipy.stats import norm
 
+from core.black_scholes import bs_greeks, implied_volatility
+from core.monte_carlo import MAX_WORKERS, merton_call_price, paths_for_error, simulate
+from core.price_store import load_ohlcv
+from core.parallel import background_executor
+from core.ui import FRAGMENTS, fragment
+
 # Set the title and favicon that appear in the browser's tab bar.
 st.set_page_config(
     page_title='Monte Carlo Stock Price Simulation',
@@ -15,19 +20,6 @@ st.set_page_config(
 # -------------------------------------------------------------------
 # Declare some useful functions.
 
-def geo_paths(S, T, r, q, sigma, steps, N):
-    """Generates paths for a geometric Brownian motion."""
-    dt = T / steps
-    # Initialize the paths with the initial log stock price
-    ST = np.zeros((steps + 1, N))
-    ST[0] = np.log(S)
-    # Simulate the log stock prices
-    for t in range(1, steps + 1):
-        ST[t] = (ST[t - 1] +
-                 (r - q - 0.5 * sigma**2) * dt +
-                 sigma * np.sqrt(dt) * np.random.normal(size=N))
-    return np.exp(ST)
-
 def black_scholes(S, K, r, T, sigma):
     """Calculate European Call Option Price using Black-Scholes formula."""
     d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * np.sqrt(T))
@@ -35,11 +27,162 @@ def black_scholes(S, K, r, T, sigma):
     call_price = S * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
     return call_price
 
+HEATMAP_SURFACES = {
+    "Price": "price",
+    "Delta": "delta",
+    "Gamma": "gamma",
+    "Vega": "vega",
+    "P(OTM)": "p_otm",
+}
+
+# Strikes priced by the simulation itself, over the heatmap's strike range.
+MODEL_GRID_STRIKES = 50
+
+PRICE_MODELS = {
+    "GBM": "gbm",
+    "Merton jump-diffusion": "merton",
+    "Heston": "heston",
+}
+
+def heatmap_strikes(S0, resolution):
+    """Strike prices shown on the heatmap."""
+    return np.linspace(int(S0 * 0.5), int(S0 * 2), resolution)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def call_surfaces(S0, r, T, resolution):
+    """
+    Call price and greek surfaces over a strike x volatility grid, computed
+    in one broadcast. Rows are strikes, columns are volatilities.
+    """
+    K_values = heatmap_strikes(S0, resolution)
+    sigma_values = np.linspace(0.1, 1.0, resolution)  # Volatilities
+
+    greeks = bs_greeks(S0, K_values[:, None], T, r, sigma_values[None, :], "call")
+    surfaces = {name: greeks[name].astype(np.float32) for name in HEATMAP_SURFACES.values()}
+    return K_values, sigma_values, surfaces
+
+# Simulation runs, one per set of inputs, kept in the session like a small
+# cache: widgets that do not change the paths (target error, chart options)
+# rerun the page without simulating again, and a multi-process run does not
+# start a new process pool. Each run is submitted to a background thread,
+# so the script thread only polls it.
+MAX_SIMULATION_JOBS = 4
+
+def simulation_job(model, model_args, N, precision, sampler, antithetic, seed, workers):
+    """The session's run for these inputs, submitted if there is none yet."""
+    key = (model, tuple(sorted(model_args.items())), N, precision, sampler, antithetic, seed, workers)
+    jobs = st.session_state.setdefault("simulation_jobs", {})
+    job = jobs.get(key)
+
+    if job is None or job["future"].cancelled() or (job["future"].done() and job["future"].exception() is not None):
+        # Runs for inputs the user has moved away from are dropped if
+        # they have not started yet.
+        for other in jobs.values():
+            other["future"].cancel()
+
+        job = {"progress": 0.0}
+        job["future"] = background_executor().submit(
+            simulate,
+            model,
+            model_args,
+            N,
+            dtype=np.dtype(precision),
+            sampler=sampler,
+            antithetic=antithetic,
+            seed=seed,
+            workers=workers,
+            progress=lambda fraction: job.update(progress=fraction),
+        )
+        jobs[key] = job
+
+        while len(jobs) > MAX_SIMULATION_JOBS:
+            jobs.pop(next(iter(jobs)))
+
+    return job
+
+# Polls the background run; once it is done the whole page reruns and
+# renders the results.
+@fragment(run_every=0.5)
+def poll_simulation(job):
+    if job["future"].done():
+        st.rerun()
+    st.progress(job["progress"], text="Simulating paths...")
+
+# Runs as a fragment where supported, so changing the grid resolution or
+# surface reruns only the heatmap, not the simulation.
+@fragment
+def display_heatmap(S0, r, T, stock_ticker):
+    col1, col2 = st.columns(2)
+    resolution = col1.select_slider('Grid resolution', options=[50, 100, 250, 500, 1000], value=50)
+    surface_name = col2.selectbox('Surface', list(HEATMAP_SURFACES))
+
+    K_values, sigma_values, surfaces = call_surfaces(S0, r, T, resolution)
+    surface = surfaces[HEATMAP_SURFACES[surface_name]]
+
+    fig, ax = plt.subplots()
+    c = ax.imshow(surface, aspect='auto', origin='lower', cmap='coolwarm', extent=[sigma_values.min(), sigma_values.max(), K_values.min(), K_values.max()])
+    ax.set_xlabel('Volatility (σ)')
+    ax.set_ylabel('Strike Price (K)')
+    ax.set_title(f"Call Option {surface_name} for {stock_ticker}")
+    fig.colorbar(c, ax=ax)
+    st.pyplot(fig)
+
+@fragment
+def display_paths(sample_paths, bands, n_paths, stock_ticker):
+    """
+    A sample of the simulated paths, optionally over the 5/25/50/75/95
+    percentile fan of all paths. Drawing cost does not depend on N.
+    """
+    col1, col2 = st.columns(2)
+    mode = col1.radio('Path display', ['Sample + percentile bands', 'Sample paths only'], horizontal=True)
+    n_shown = col2.slider(
+        'Paths drawn', min_value=1, max_value=sample_paths.shape[1],
+        value=min(100, sample_paths.shape[1]),
+    ) if sample_paths.shape[1] > 1 else 1
+
+    steps = np.arange(sample_paths.shape[0])
+
+    fig, ax = plt.subplots()
+    if mode == 'Sample + percentile bands':
+        ax.plot(sample_paths[:, :n_shown], color='grey', linewidth=0.5, alpha=0.3)
+        ax.fill_between(steps, bands[5], bands[95], color='tab:blue', alpha=0.2, label='5-95%')
+        ax.fill_between(steps, bands[25], bands[75], color='tab:blue', alpha=0.4, label='25-75%')
+        ax.plot(steps, bands[50], color='tab:blue', linewidth=2, label='Median')
+        ax.legend(loc='upper left')
+    else:
+        ax.plot(sample_paths[:, :n_shown])
+    ax.set_xlabel("Time Steps")
+    ax.set_ylabel("Stock Price")
+    ax.set_title(f"Simulated Stock Price Paths for {stock_ticker} ({n_shown:,} of {n_paths:,} shown)")
+    st.pyplot(fig)
+
+CONVERGENCE_LABELS = {
+    "Final Price": "Running Mean of Final Stock Prices",
+    "Call Payoff": "Running Mean of Discounted Call Payoff",
+    "Hit Probability": "Running Probability of Touching K",
+}
+
+@fragment
+def display_convergence(convergence, references, stock_ticker):
+    estimator = st.selectbox('Estimator', list(convergence))
+    table = convergence[estimator]
+
+    fig, ax = plt.subplots()
+    ax.plot(table["n"], table["mean"], label='Convergence of Estimate')
+    ax.fill_between(table["n"], table["ci_low"], table["ci_high"], alpha=0.3, label='95% CI')
+    if references[estimator] is not None:
+        ax.axhline(references[estimator], color='black', linestyle='--', linewidth=1, label='Analytical')
+    ax.set_xlabel("Number of Simulations")
+    ax.set_ylabel(CONVERGENCE_LABELS[estimator])
+    ax.set_title(f"Convergence Chart for {stock_ticker}")
+    ax.legend()
+    st.pyplot(fig)
+
 @st.cache_data
 def get_stock_data(ticker, start, end):
-    """Fetch stock data using yfinance."""
+    """Fetch stock data from the local price store (Yahoo Finance)."""
     try:
-        stock_data = yf.download(ticker, start=start, end=end)
+        stock_data = load_ohlcv(ticker, start=start, end=end, auto_adjust=True)
         return stock_data['Close']
     except Exception as e:
         st.error(f"Error fetching data for {ticker}: {e}")
@@ -81,68 +224,154 @@ if stock_ticker:
             r = st.sidebar.slider('Risk-Free Rate (r)', min_value=0.0, max_value=0.1, value=0.05, step=0.01)
             sigma = st.sidebar.slider('Volatility (σ)', min_value=0.05, max_value=1.0, value=0.2, step=0.01)
             T = st.sidebar.slider('Time to Maturity (T) Years', min_value=0.05, max_value=5.0, value=1.0, step=0.1)
-            N = st.sidebar.slider('Number of Simulations (N)', min_value=10, max_value=1000, value=100)
+            N = st.sidebar.number_input('Number of Simulations (N)', min_value=10, max_value=10_000_000, value=100, step=100)
+            precision = st.sidebar.selectbox('Precision', ['float32', 'float64'])
+            workers = st.sidebar.slider(
+                'Worker processes', min_value=1, max_value=max(MAX_WORKERS, 2), value=1,
+                help="Splits the paths across processes. Results are reproducible for a given seed and worker count.",
+            )
+            seed = st.sidebar.number_input('Random seed', min_value=0, value=42, step=1)
+
+            st.sidebar.subheader("Variance Reduction")
+            sampler = st.sidebar.selectbox(
+                'Sampler', ['pseudo', 'sobol', 'halton'],
+                help="Sobol/Halton use scrambled quasi-random numbers with a Brownian-bridge path construction.",
+            )
+            antithetic = st.sidebar.checkbox('Antithetic variates', value=False)
+            control_variate = st.sidebar.checkbox(
+                'Control variate', value=False,
+                help="Uses the discounted final price, whose exact mean S0·e^(-qT) is known, to correct the call estimate.",
+            )
+            target_error = st.sidebar.number_input('Target standard error', min_value=0.0001, value=0.01, step=0.001, format="%.4f")
 
             # Time steps fixed at 100 for now
             steps = 100
 
-            # Perform Monte Carlo simulation
-            paths = geo_paths(S0, T, r, 0, sigma, steps, N)
+            st.sidebar.subheader("Price Model")
+            model_name = st.sidebar.selectbox('Model', list(PRICE_MODELS))
+            model_args = {"S": S0, "T": T, "r": r, "q": 0.0, "steps": steps}
+
+            if model_name == "Merton jump-diffusion":
+                lam = st.sidebar.slider('Jumps per year (λ)', min_value=0.0, max_value=5.0, value=0.5, step=0.1)
+                mu_jump = st.sidebar.slider('Mean log jump (μ_J)', min_value=-0.5, max_value=0.5, value=-0.1, step=0.01)
+                sigma_jump = st.sidebar.slider('Jump volatility (δ)', min_value=0.0, max_value=0.5, value=0.15, step=0.01)
+                model_args.update(sigma=sigma, lam=lam, mu_jump=mu_jump, sigma_jump=sigma_jump)
+            elif model_name == "Heston":
+                kappa = st.sidebar.slider('Mean reversion (κ)', min_value=0.1, max_value=10.0, value=2.0, step=0.1)
+                theta_vol = st.sidebar.slider('Long-run volatility (√θ)', min_value=0.05, max_value=1.0, value=sigma, step=0.01)
+                xi = st.sidebar.slider('Vol of variance (ξ)', min_value=0.0, max_value=2.0, value=0.5, step=0.05)
+                rho = st.sidebar.slider('Correlation (ρ)', min_value=-0.99, max_value=0.99, value=-0.7, step=0.01)
+                model_args.update(v0=sigma**2, kappa=kappa, theta=theta_vol**2, xi=xi, rho=rho)
+            else:
+                model_args.update(sigma=sigma)
+
+            # K first (used by the metrics and convergence chart), then the
+            # heatmap strike grid, all priced from the same paths.
+            grid_strikes = heatmap_strikes(S0, MODEL_GRID_STRIKES)
+
+            # Perform Monte Carlo simulation. Paths are streamed in chunks,
+            # so only the first 1000 paths (an iid sample) are kept for the
+            # chart; the percentile bands cover every path.
+            job = simulation_job(
+                PRICE_MODELS[model_name],
+                {
+                    **model_args,
+                    "strikes": (float(K), *grid_strikes.tolist()),
+                    "n_sample_paths": min(int(N), 1000),
+                    "barrier": K,
+                    "control_variate": control_variate,
+                },
+                int(N),
+                precision,
+                sampler,
+                antithetic,
+                int(seed),
+                workers,
+            )
+
+            if not job["future"].done() and FRAGMENTS:
+                poll_simulation(job)
+                st.stop()
+
+            # Without fragments there is nothing to poll with, so wait here.
+            sim = job["future"].result()
 
             # Plot the simulation paths
             st.subheader('Monte Carlo Simulation Results')
-            fig, ax = plt.subplots()
-            ax.plot(paths)
-            ax.set_xlabel("Time Steps")
-            ax.set_ylabel("Stock Price")
-            ax.set_title(f"Simulated Stock Price Paths for {stock_ticker}")
-            st.pyplot(fig)
+            display_paths(sim["sample_paths"], sim["percentiles"], sim["n_paths"], stock_ticker)
 
             # Displaying some statistics
-            st.write("Monte Carlo Simulation Generates paths for a geometric Brownian motion.")
-            st.latex(r"S_t = S_0 \exp\left((\mu - \frac{1}{2}\sigma^2)t + \sigma W_t \right)")
-            st.latex(r"W_{t+u}-W_t \sim \mathcal{N}(0,u)")
-            st.write(f"Simulated final stock price mean: {paths[-1].mean():.2f}")
-            st.write(f"Simulated final stock price standard deviation: {paths[-1].std():.2f}")
+            if model_name == "GBM":
+                st.write("Monte Carlo Simulation Generates paths for a geometric Brownian motion.")
+                st.latex(r"S_t = S_0 \exp\left((\mu - \frac{1}{2}\sigma^2)t + \sigma W_t \right)")
+                st.latex(r"W_{t+u}-W_t \sim \mathcal{N}(0,u)")
+            elif model_name == "Merton jump-diffusion":
+                st.write("Monte Carlo Simulation Generates paths for a Merton jump-diffusion.")
+                st.latex(r"\frac{dS_t}{S_{t^-}} = (r - \lambda k)\,dt + \sigma\,dW_t + (J - 1)\,dN_t, \quad \ln J \sim \mathcal{N}(\mu_J, \delta^2)")
+            else:
+                st.write("Monte Carlo Simulation Generates paths for the Heston stochastic volatility model (full-truncation Euler).")
+                st.latex(r"dS_t = r S_t\,dt + \sqrt{v_t} S_t\,dW^S_t, \quad dv_t = \kappa(\theta - v_t)\,dt + \xi\sqrt{v_t}\,dW^v_t, \quad d\langle W^S, W^v \rangle_t = \rho\,dt")
+            st.write(f"Simulated final stock price mean: {sim['terminal_mean']:.2f}")
+            st.write(f"Simulated final stock price standard deviation: {sim['terminal_std']:.2f}")
+
+            bs_call = black_scholes(S0, K, r, T, sigma)
+            if model_name == "Merton jump-diffusion":
+                reference_call = merton_call_price(S0, K, T, r, sigma, lam, mu_jump, sigma_jump)[0]
+                reference_label = "Merton"
+            else:
+                reference_call, reference_label = bs_call, "Black-Scholes"
+            mc_call = sim['call_prices'][0]
+            std_error = sim['call_std_errors'][0]
+            paths_needed = paths_for_error(std_error, sim['n_paths'], target_error)
+
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("MC Call Price", f"{mc_call:.4f}", f"{mc_call - reference_call:+.4f} vs {reference_label}")
+            col2.metric(reference_label, f"{reference_call:.4f}")
+            col3.metric("Standard Error", f"{std_error:.5f}")
+            col4.metric("Paths for Target", f"{paths_needed:,.0f}")
+
+            bands = sim["percentiles"]
+            st.write(
+                "Final stock price percentiles: " +
+                ", ".join(f"P{p}: {band[-1]:.2f}" for p, band in bands.items())
+            )
+            st.write(f"Probability of touching K={K} before maturity: {sim['hit_probability']:.2%}")
 
             # -------------------------------------------------------------------
             # Volatility Heatmap for Call Prices
             st.subheader('Volatility Heatmap for Call Option Prices')
-            K_values = np.linspace(int(S0 * 0.5), int(S0 * 2), 50)  # Strike prices
-            sigma_values = np.linspace(0.1, 1.0, 50)  # Volatilities
-            call_prices = np.zeros((len(K_values), len(sigma_values)))
-
-            for i, K_val in enumerate(K_values):
-                for j, sigma_val in enumerate(sigma_values):
-                    call_prices[i, j] = black_scholes(S0, K_val, r, T, sigma_val)
-
-            fig, ax = plt.subplots()
-            c = ax.imshow(call_prices, aspect='auto', cmap='coolwarm', extent=[sigma_values.min(), sigma_values.max(), K_values.min(), K_values.max()])
-            ax.set_xlabel('Volatility (σ)')
-            ax.set_ylabel('Strike Price (K)')
-            ax.set_title(f"Call Option Prices for {stock_ticker}")
-            fig.colorbar(c, ax=ax)
-            st.pyplot(fig)
+            display_heatmap(S0, r, T, stock_ticker)
 
             # -------------------------------------------------------------------
-            # Convergence Plot for Monte Carlo Simulation
-            cumulative_averages = []
-            total = 0
+            # Model prices over the heatmap strike grid, from one simulation
+            st.subheader(f'{model_name} Call Prices Across Strikes')
+            grid_prices = sim['call_prices'][1:]
+            grid_errors = sim['call_std_errors'][1:]
+            model_iv = implied_volatility(grid_prices, S0, grid_strikes, T, r, "call")
 
-            # Calculate cumulative averages over each simulation
-            for i in range(1, N + 1):
-                total += paths[-1, i - 1]  # Sum of the final stock prices
-                cumulative_averages.append(total / i)  # Cumulative average
+            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(10, 4))
+            ax1.plot(grid_strikes, grid_prices, label=f'{model_name} (MC)')
+            ax1.fill_between(grid_strikes, grid_prices - 1.96 * grid_errors, grid_prices + 1.96 * grid_errors, alpha=0.3)
+            ax1.plot(grid_strikes, black_scholes(S0, grid_strikes, r, T, sigma), linestyle='--', label='Black-Scholes')
+            ax1.set_xlabel('Strike Price (K)')
+            ax1.set_ylabel('Call Price')
+            ax1.legend()
+            ax2.plot(grid_strikes, model_iv * 100)
+            ax2.axhline(sigma * 100, color='black', linestyle='--', linewidth=1)
+            ax2.set_xlabel('Strike Price (K)')
+            ax2.set_ylabel('Implied Volatility %')
+            ax2.set_title('Implied Volatility Smile')
+            st.pyplot(fig)
 
-            # Plot the convergence chart
+            # -------------------------------------------------------------------
+            # Convergence Plot for Monte Carlo Simulation
             st.subheader('Convergence of Monte Carlo Simulations')
-            fig, ax = plt.subplots()
-            ax.plot(range(1, N + 1), cumulative_averages, label='Convergence of Estimate')
-            ax.set_xlabel("Number of Simulations")
-            ax.set_ylabel("Cumulative Average of Final Stock Prices")
-            ax.set_title(f"Convergence Chart for {stock_ticker}")
-            ax.legend()
-            st.pyplot(fig)
+            references = {
+                "Final Price": S0 * np.exp(r * T),
+                "Call Payoff": reference_call if model_name != "Heston" else None,
+                "Hit Probability": None,
+            }
+            display_convergence(sim["convergence"], references, stock_ticker)
         else:
             st.warning("Unable to fetch the latest stock price.")
     else:
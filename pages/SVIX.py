@@ -1,8 +1,9 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from core.price_store import load_ohlcv
+
 st.title("VIX Analysis + SVIX Rolling Z-Score Signals")
 
 # ---------------------------------------------------------------------
@@ -18,22 +19,10 @@ ENTRY_LEVEL = st.number_input(
     step=0.5
 )
 
-# ---------------------------------------------------------------------
-# Helper to flatten yfinance columns
-# ---------------------------------------------------------------------
-def flatten_yf_columns(df: pd.DataFrame) -> pd.DataFrame:
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = [
-            col[0] if isinstance(col, tuple) and len(col) > 0 else col
-            for col in df.columns
-        ]
-    return df
-
 # ---------------------------------------------------------------------
 # Download VIX Data
 # ---------------------------------------------------------------------
-vix = yf.download("^VIX", start="2000-01-01", auto_adjust=False, progress=False)
-vix = flatten_yf_columns(vix)
+vix = load_ohlcv("^VIX", start="2000-01-01", auto_adjust=False)
 
 vix = vix[["High", "Low"]].dropna().copy()
 vix["High"] = pd.to_numeric(vix["High"], errors="coerce")
@@ -87,8 +76,7 @@ else:
 # ---------------------------------------------------------------------
 st.header("SVIX Rolling 20-Day Z-Score Strategy")
 
-svix = yf.download("SVIX", start="2020-03-01", auto_adjust=False, progress=False)
-svix = flatten_yf_columns(svix)
+svix = load_ohlcv("SVIX", start="2020-03-01", auto_adjust=False)
 
 svix = svix[["Close"]].dropna().copy()
 svix["Close"] = pd.to_numeric(svix["Close"], errors="coerce")
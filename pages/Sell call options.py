@@ -2,27 +2,13 @@
 import streamlit as st
 import yfinance as yf
 import pandas as pd
-import numpy as np
-from scipy.stats import norm
 from datetime import datetime
 
-# Black-Scholes Option Pricing Model
-def black_scholes(S, K, T, r, sigma, option_type="call"):
-    d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-    d2 = d1 - sigma * np.sqrt(T)
-    if option_type == "call":
-        return S * norm.cdf(d1) - K * np.exp(-r * T) * norm.cdf(d2)
-    elif option_type == "put":
-        return K * np.exp(-r * T) * norm.cdf(-d2) - S * norm.cdf(-d1)
-
-# Function to calculate probability of expiring OTM
-def probability_otm(S, K, T, r, sigma, option_type="call"):
-    d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-    d2 = d1 - sigma * np.sqrt(T)
-    if option_type == "call":
-        return 1 - norm.cdf(d2)  # Probability of expiring OTM for calls
-    elif option_type == "put":
-        return norm.cdf(d2)  # Probability of expiring OTM for puts
+# Black-Scholes Option Pricing Model and probability of expiring OTM,
+# computed for a whole chain at once
+from core.black_scholes import bs_greeks, implied_volatility
+from core.option_chains import calc_mid_price
+from core.spreads import put_credit_spreads
 
 # App title and description
 st.title("Options Selling Model App with Probability of Expiring OTM")
@@ -66,69 +52,34 @@ try:
 
             # Calculate OPM and probability of expiring OTM for each option
             def calculate_opm_and_otm_prob(df, option_type):
-                df = df.dropna(subset=['impliedVolatility'])
-                df["OPM"] = df.apply(
-                    lambda x: black_scholes(
-                        S=stock_price,
-                        K=x["strike"],
-                        T=T,
-                        r=risk_free_rate,
-                        sigma=x["impliedVolatility"],
-                        option_type=option_type
-                    ),
-                    axis=1
+                df = df.dropna(subset=['impliedVolatility']).copy()
+                greeks = bs_greeks(
+                    S=stock_price,
+                    K=df["strike"].to_numpy(),
+                    T=T,
+                    r=risk_free_rate,
+                    sigma=df["impliedVolatility"].to_numpy(),
+                    option_type=option_type
                 )
-                df["P(OTM)"] = df.apply(
-                    lambda x: probability_otm(
+                df["OPM"] = greeks["price"]
+                df["P(OTM)"] = greeks["p_otm"]
+
+                # Yahoo's impliedVolatility is often stale or zero,
+                # so also solve IV from the bid/ask mid and the last trade
+                for column, price in [
+                    ("IV (Mid)", calc_mid_price(df["bid"], df["ask"])),
+                    ("IV (Last)", df["lastPrice"].to_numpy()),
+                ]:
+                    df[column] = implied_volatility(
+                        price=price,
                         S=stock_price,
-                        K=x["strike"],
+                        K=df["strike"].to_numpy(),
                         T=T,
                         r=risk_free_rate,
-                        sigma=x["impliedVolatility"],
                         option_type=option_type
-                    ),
-                    axis=1
-                )
+                    )
                 return df
             
-            # find_best_put_credit_spread
-            def find_best_put_credit_spread(puts_df, stock_price, spread_widths):
-                best_spread = None
-                max_ror = -float('inf')
-
-                for width in spread_widths:
-                    for idx, short_put in puts_df.iterrows():
-                        short_strike = short_put['strike']
-                        long_strike = short_strike - width
-
-                        # Find matching long put
-                        long_put = puts_df[puts_df['strike'] == long_strike]
-                        if long_put.empty:
-                            continue
-                        long_put = long_put.iloc[0]
-
-                        # Calculate metrics
-                        net_credit = short_put['OPM'] - long_put['OPM']
-                        max_loss = width - net_credit
-                        if max_loss <= 0:
-                            continue  # Avoid division by zero or negative loss
-                        ror = net_credit / max_loss
-                        breakeven = short_strike - net_credit
-
-                        if ror > max_ror:
-                            max_ror = ror
-                            best_spread = {
-                                'Short Strike': short_strike,
-                                'Long Strike': long_strike,
-                                'Net Credit': round(net_credit, 2),
-                                'Max Loss': round(max_loss, 2),
-                                'Return on Risk': round(ror * 100, 2),
-                                'Break-even': round(breakeven, 2),
-                                'Probability OTM': round(short_put['P(OTM)'] * 100, 2)
-                            }
-
-                return best_spread
-
             # Calculate OPM and P(OTM) for calls and puts
             calls = calculate_opm_and_otm_prob(calls, "call")
             puts = calculate_opm_and_otm_prob(puts, "put")
@@ -141,22 +92,47 @@ try:
 
             # Display the filtered options
             st.write("### Filtered Options for Selling")
-            st.write(filtered_options[["Type", "strike", "lastPrice", "impliedVolatility", "OPM", "P(OTM)"]])
-             # Define spread widths to evaluate
-            spread_widths = [5, 10, 15, 20,25,30]
+            st.write(filtered_options[["Type", "strike", "lastPrice", "impliedVolatility", "IV (Mid)", "IV (Last)", "OPM", "P(OTM)"]])
+
+            # Put credit spreads: every (short, long) pair in one vectorized pass
+            st.subheader("📊 Put Credit Spreads")
+
+            any_width = st.sidebar.checkbox("Any spread width (every strike pair)", value=False)
+            widths_text = st.sidebar.text_input("Spread widths (comma separated)", "5,10,15,20,25,30")
+
+            try:
+                spread_widths = None if any_width else [
+                    float(w) for w in widths_text.split(",") if w.strip()
+                ]
+            except ValueError:
+                st.error("Spread widths must be numbers separated by commas.")
+                spread_widths = []
 
             # Filter puts based on user-defined OTM probability
             filtered_puts = puts[(puts['P(OTM)'] >= otm_prob_filter[0]) & (puts['P(OTM)'] <= otm_prob_filter[1])]
             st.write(filtered_puts)
-            # Find the best spread
-            best_spread = find_best_put_credit_spread(filtered_puts, stock_price, spread_widths)
-            
-            # Display the result
-            if best_spread:
-                st.subheader("📊 Optimal Put Credit Spread")
-                st.write(pd.DataFrame([best_spread]))
-            else:
+
+            # Short legs come from the filtered puts, long legs from the whole chain
+            spreads = put_credit_spreads(filtered_puts, long_puts=puts, widths=spread_widths)
+
+            if spreads.empty:
                 st.warning("No suitable put credit spread found for the selected parameters.")
+            else:
+                min_ror = st.sidebar.number_input("Minimum Return on Risk (%)", min_value=0.0, value=0.0, step=1.0)
+                max_breakeven = st.sidebar.number_input(
+                    "Maximum Break-even", min_value=0.0, value=float(stock_price), step=1.0
+                )
+
+                ranked = spreads[
+                    (spreads["Return on Risk"] >= min_ror) &
+                    (spreads["Break-even"] <= max_breakeven)
+                ]
+
+                st.write("#### Optimal Put Credit Spread")
+                st.write(ranked.head(1).round(2))
+
+                st.write(f"#### All Spreads ({len(ranked)} of {len(spreads)}), ranked by Return on Risk")
+                st.dataframe(ranked.round(2), use_container_width=True)
 except Exception as e:
     st.error("Could not retrieve data for the provided ticker symbol. Please check the ticker and try again.")
     st.error(f"Error details: {e}")
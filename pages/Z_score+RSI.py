@@ -1,9 +1,10 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import plotly.graph_objects as go
 from datetime import date
 
+from core.price_store import load_ohlcv
+
 
 st.set_page_config(
     page_title="RSI + Diff Z-Score 22 Days Buy Signal App",
@@ -214,19 +215,13 @@ def create_zscore_chart(
 
 @st.cache_data
 def load_data(ticker: str, start_date, end_date) -> pd.DataFrame:
-    df = yf.download(
+    return load_ohlcv(
         ticker,
         start=start_date,
         end=end_date,
-        auto_adjust=True,
-        progress=False
+        auto_adjust=True
     )
 
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = df.columns.get_level_values(0)
-
-    return df
-
 
 st.title("RSI + Diff Z-Score 22 Days Buy Signal Dashboard")
 
@@ -1,9 +1,10 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
 from scipy.stats import skew, kurtosis
 import streamlit as st
 
+from core.price_store import load_close_matrix
+
 st.title('Welcome to my Anomaly Detection App')
 st.subheader('Based on Diff Z-Score 22 Days')
 st.image("pages/skewness.png")
@@ -61,37 +62,38 @@ if st.sidebar.button("Remove Selected Tickers"):
 etfs = st.session_state.etfs
 results = []
 
-for etf in etfs:
-    end_date = pd.Timestamp.now()
 
-    # Download enough data to calculate:
-    # 1. 22-day price z-score
-    # 2. 22-day difference z-score
-    start_date = end_date - pd.DateOffset(days=90)
+@st.cache_data(show_spinner=False, ttl=60 * 30)
+def load_watchlist_closes(tickers: tuple, start_date, end_date) -> pd.DataFrame:
+    """
+    Close prices for the whole watchlist, one column per ticker,
+    refreshed from Yahoo in one batched request.
+    """
+    return load_close_matrix(
+        list(tickers),
+        start=start_date,
+        end=end_date,
+        auto_adjust=True
+    )
 
-    try:
-        raw_data = yf.download(
-            etf,
-            start=start_date,
-            end=end_date,
-            progress=False
-        )
 
-        if raw_data.empty:
-            st.warning(f"No data for {etf}. Skipping.")
-            continue
+end_date = pd.Timestamp.now().normalize() + pd.DateOffset(days=1)
 
-        if "Close" not in raw_data.columns:
-            st.warning(f"'Close' column not found for {etf}. Skipping.")
-            continue
+# Download enough data to calculate:
+# 1. 22-day price z-score
+# 2. 22-day difference z-score
+start_date = end_date - pd.DateOffset(days=90)
 
-        data = raw_data["Close"]
+with st.spinner(f"Loading prices for {len(etfs)} tickers..."):
+    closes = load_watchlist_closes(tuple(etfs), start_date, end_date)
 
-        # Ensure data is a Series, not a DataFrame
-        if isinstance(data, pd.DataFrame):
-            data = data.squeeze()
+for etf in etfs:
+    try:
+        if etf not in closes.columns:
+            st.warning(f"No data for {etf}. Skipping.")
+            continue
 
-        data = pd.to_numeric(data, errors="coerce").dropna()
+        data = pd.to_numeric(closes[etf], errors="coerce").dropna()
 
         if data.empty:
             st.warning(f"No valid closing price data for {etf}. Skipping.")
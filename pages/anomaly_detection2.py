@@ -9,7 +9,7 @@ Important deployment fixes:
 - Uses Plotly only, not matplotlib/seaborn, to avoid Streamlit Cloud segmentation faults.
 - Replaces deprecated use_container_width=True with width="stretch" where supported.
 - Rounds only numeric columns before display.
-- Uses cached yfinance downloads.
+- Reads prices from the shared local price store (core/price_store.py).
 """
 
 from __future__ import annotations
@@ -19,7 +19,8 @@ from datetime import date, timedelta
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
-import yfinance as yf
+
+from core.price_store import load_ohlcv
 
 
 # =============================================================================
@@ -65,47 +66,16 @@ def round_numeric_columns(df: pd.DataFrame, digits: int = 2) -> pd.DataFrame:
     return df_display
 
 
-def flatten_yfinance_columns(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    yfinance may return MultiIndex columns.
-    For one ticker, flatten to standard columns like Close, Open, High, Low.
-    """
-    if isinstance(df.columns, pd.MultiIndex):
-        level_0 = df.columns.get_level_values(0)
-        level_1 = df.columns.get_level_values(1)
-
-        if "Close" in level_0:
-            df.columns = level_0
-        elif "Close" in level_1:
-            df.columns = level_1
-        else:
-            df.columns = ["_".join(map(str, col)).strip() for col in df.columns]
-
-    return df
-
-
 @st.cache_data(show_spinner=False, ttl=60 * 30)
 def download_prices(symbol: str, start: str, end: str) -> pd.DataFrame:
     """
-    Download price data from Yahoo Finance.
+    Load price data from the local price store.
 
     Notes:
-    - progress=False prevents noisy console output.
-    - threads=False is often more stable on Streamlit Cloud.
+    - Only bars newer than the stored history are downloaded from Yahoo.
     - auto_adjust=False preserves the regular Close column behavior.
     """
-    data = yf.download(
-        symbol,
-        start=start,
-        end=end,
-        progress=False,
-        threads=False,
-        auto_adjust=False,
-    )
-
-    data = flatten_yfinance_columns(data)
-    data = data.sort_index()
-    return data
+    return load_ohlcv(symbol, start, end, auto_adjust=False)
 
 
 def add_one_day(d: date) -> date:
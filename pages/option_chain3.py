@@ -4,9 +4,24 @@ import streamlit as st
 import yfinance as yf
 import pandas as pd
 import numpy as np
-from scipy.stats import norm
 from datetime import date
 
+from core.black_scholes import bs_greeks, implied_volatility
+from core.option_chains import (
+    add_contract_metrics,
+    calc_cagr_by_last_price,
+    calc_mid_price,
+    calc_period_return,
+    fetch_chain,
+    fetch_quote,
+    fetch_surface,
+    get_stock_price,
+    load_universe,
+    screen_puts,
+)
+from core.put_ladder import optimize_put_ladder
+from core.ui import fragment
+
 
 st.set_page_config(page_title="Options Chain CAGR", layout="wide")
 
@@ -23,6 +38,12 @@ if "option_chain_loaded" not in st.session_state:
 if "option_table" not in st.session_state:
     st.session_state.option_table = None
 
+if "option_table_styles" not in st.session_state:
+    st.session_state.option_table_styles = None
+
+if "option_table_csv" not in st.session_state:
+    st.session_state.option_table_csv = None
+
 if "option_stock_price" not in st.session_state:
     st.session_state.option_stock_price = None
 
@@ -47,49 +68,54 @@ if "put_ladder_base_df" not in st.session_state:
 if "put_ladder_params" not in st.session_state:
     st.session_state.put_ladder_params = None
 
+if "option_surface" not in st.session_state:
+    st.session_state.option_surface = None
 
-# =====================================================
-# Helper functions
-# =====================================================
-def get_stock_price(ticker_obj):
-    try:
-        price = ticker_obj.fast_info.get("last_price")
-        if price is not None and price > 0:
-            return float(price)
-    except Exception:
-        pass
+if "option_surface_failed" not in st.session_state:
+    st.session_state.option_surface_failed = []
 
-    hist = ticker_obj.history(period="5d")
-    if hist.empty:
-        raise ValueError("Could not get stock price.")
+if "option_surface_ticker" not in st.session_state:
+    st.session_state.option_surface_ticker = None
 
-    return float(hist["Close"].dropna().iloc[-1])
+if "option_surface_stock_price" not in st.session_state:
+    st.session_state.option_surface_stock_price = None
 
+if "put_ladder_optimizer_results" not in st.session_state:
+    st.session_state.put_ladder_optimizer_results = None
 
-def bs_delta(option_type, S, K, T, r, iv):
-    if pd.isna(iv) or iv <= 0 or S <= 0 or K <= 0 or T <= 0:
-        return np.nan
+if "put_screener_results" not in st.session_state:
+    st.session_state.put_screener_results = None
 
-    d1 = (np.log(S / K) + (r + 0.5 * iv**2) * T) / (iv * np.sqrt(T))
+if "put_screener_failed" not in st.session_state:
+    st.session_state.put_screener_failed = []
 
-    if option_type == "CALL":
-        return norm.cdf(d1)
 
-    return norm.cdf(d1) - 1
+# =====================================================
+# Helper functions
+# =====================================================
+@st.cache_data(show_spinner=False, ttl=60 * 5)
+def load_option_surface(ticker):
+    """
+    Every expiration of the ticker, fetched in parallel.
+    Cached per ticker for 5 minutes.
+    """
+    return fetch_surface(ticker)
 
 
-def calc_cagr_by_last_price(last_price, capital_base, dte):
+@st.cache_data(show_spinner=False, ttl=60 * 5)
+def load_quote(ticker):
     """
-    CAGR = (1 + last_price / capital_base) ^ (365 / DTE) - 1
-    Returned as percent.
+    Stock price and expirations for the screener, cached per ticker.
     """
-    if pd.isna(last_price) or pd.isna(capital_base):
-        return np.nan
+    return fetch_quote(ticker)
 
-    if last_price <= 0 or capital_base <= 0 or dte <= 0:
-        return np.nan
 
-    return ((1 + last_price / capital_base) ** (365 / dte) - 1) * 100
+@st.cache_data(show_spinner=False, ttl=60 * 5)
+def load_chain(ticker, expiration):
+    """
+    One option chain for the screener, cached per (ticker, expiration).
+    """
+    return fetch_chain(yf.Ticker(ticker), expiration)
 
 
 def prepare_calls(calls, stock_price, dte, r):
@@ -98,38 +124,50 @@ def prepare_calls(calls, stock_price, dte, r):
 
     calls["Call IV %"] = calls["impliedVolatility"] * 100
 
-    calls["Call Delta"] = calls.apply(
-        lambda row: bs_delta(
-            option_type="CALL",
-            S=stock_price,
-            K=row["strike"],
-            T=T,
-            r=r,
-            iv=row["impliedVolatility"]
-        ),
-        axis=1
-    )
+    # IV solved from the bid/ask mid and from the last trade,
+    # since Yahoo's impliedVolatility is often stale or zero
+    calls["Call IV Mid %"] = implied_volatility(
+        price=calc_mid_price(calls["bid"], calls["ask"]),
+        S=stock_price,
+        K=calls["strike"].to_numpy(),
+        T=T,
+        r=r,
+        option_type="call"
+    ) * 100
+
+    calls["Call IV Last %"] = implied_volatility(
+        price=calls["lastPrice"].to_numpy(),
+        S=stock_price,
+        K=calls["strike"].to_numpy(),
+        T=T,
+        r=r,
+        option_type="call"
+    ) * 100
+
+    calls["Call Delta"] = bs_greeks(
+        S=stock_price,
+        K=calls["strike"].to_numpy(),
+        T=T,
+        r=r,
+        sigma=calls["impliedVolatility"].to_numpy(),
+        option_type="call"
+    )["delta"]
 
     calls["Call ITM"] = stock_price > calls["strike"]
 
     # Call period return by LAST CALL PRICE
     # Capital base = stock price
-    calls["Call Period Return %"] = calls.apply(
-        lambda row: (row["lastPrice"] / stock_price) * 100
-        if not pd.isna(row["lastPrice"]) and row["lastPrice"] >= 0 and stock_price > 0
-        else np.nan,
-        axis=1
+    calls["Call Period Return %"] = calc_period_return(
+        last_price=calls["lastPrice"].to_numpy(),
+        capital_base=stock_price
     )
 
     # Call CAGR by LAST CALL PRICE
     # Capital base = stock price, like covered call logic
-    calls["Call CAGR %"] = calls.apply(
-        lambda row: calc_cagr_by_last_price(
-            last_price=row["lastPrice"],
-            capital_base=stock_price,
-            dte=dte
-        ),
-        axis=1
+    calls["Call CAGR %"] = calc_cagr_by_last_price(
+        last_price=calls["lastPrice"].to_numpy(),
+        capital_base=stock_price,
+        dte=dte
     )
 
     calls = calls.rename(columns={
@@ -148,6 +186,8 @@ def prepare_calls(calls, stock_price, dte, r):
         "Call Volume",
         "Call OI",
         "Call IV %",
+        "Call IV Mid %",
+        "Call IV Last %",
         "Call Delta",
         "Call Period Return %",
         "Call CAGR %",
@@ -163,38 +203,50 @@ def prepare_puts(puts, stock_price, dte, r):
 
     puts["Put IV %"] = puts["impliedVolatility"] * 100
 
-    puts["Put Delta"] = puts.apply(
-        lambda row: bs_delta(
-            option_type="PUT",
-            S=stock_price,
-            K=row["strike"],
-            T=T,
-            r=r,
-            iv=row["impliedVolatility"]
-        ),
-        axis=1
-    )
+    # IV solved from the bid/ask mid and from the last trade,
+    # since Yahoo's impliedVolatility is often stale or zero
+    puts["Put IV Mid %"] = implied_volatility(
+        price=calc_mid_price(puts["bid"], puts["ask"]),
+        S=stock_price,
+        K=puts["strike"].to_numpy(),
+        T=T,
+        r=r,
+        option_type="put"
+    ) * 100
+
+    puts["Put IV Last %"] = implied_volatility(
+        price=puts["lastPrice"].to_numpy(),
+        S=stock_price,
+        K=puts["strike"].to_numpy(),
+        T=T,
+        r=r,
+        option_type="put"
+    ) * 100
+
+    puts["Put Delta"] = bs_greeks(
+        S=stock_price,
+        K=puts["strike"].to_numpy(),
+        T=T,
+        r=r,
+        sigma=puts["impliedVolatility"].to_numpy(),
+        option_type="put"
+    )["delta"]
 
     puts["Put ITM"] = stock_price < puts["strike"]
 
     # Put period return by LAST PUT PRICE
     # Period Return = Put Last Price / Strike
-    puts["Put Period Return %"] = puts.apply(
-        lambda row: (row["lastPrice"] / row["strike"]) * 100
-        if not pd.isna(row["lastPrice"]) and row["lastPrice"] >= 0 and row["strike"] > 0
-        else np.nan,
-        axis=1
+    puts["Put Period Return %"] = calc_period_return(
+        last_price=puts["lastPrice"].to_numpy(),
+        capital_base=puts["strike"].to_numpy()
     )
 
     # Put CAGR by LAST PUT PRICE
     # Capital base = strike, like cash-secured put logic
-    puts["Put CAGR %"] = puts.apply(
-        lambda row: calc_cagr_by_last_price(
-            last_price=row["lastPrice"],
-            capital_base=row["strike"],
-            dte=dte
-        ),
-        axis=1
+    puts["Put CAGR %"] = calc_cagr_by_last_price(
+        last_price=puts["lastPrice"].to_numpy(),
+        capital_base=puts["strike"].to_numpy(),
+        dte=dte
     )
 
     puts = puts.rename(columns={
@@ -213,6 +265,8 @@ def prepare_puts(puts, stock_price, dte, r):
         "Put Volume",
         "Put OI",
         "Put IV %",
+        "Put IV Mid %",
+        "Put IV Last %",
         "Put Delta",
         "Put Period Return %",
         "Put CAGR %",
@@ -222,25 +276,95 @@ def prepare_puts(puts, stock_price, dte, r):
     return puts[keep_cols]
 
 
-def style_itm(row):
-    styles = [""] * len(row)
+ITM_CSS = "background-color: #264b70; color: white;"
+STRIKE_CSS = "background-color: #333333; color: white; font-weight: bold;"
 
-    call_itm = bool(row.get("Call ITM", False)) if not pd.isna(row.get("Call ITM", np.nan)) else False
-    put_itm = bool(row.get("Put ITM", False)) if not pd.isna(row.get("Put ITM", np.nan)) else False
+# Above this many rows the chain is shown without the Styler pass
+STYLED_ROW_LIMIT = 300
 
-    for i, col in enumerate(row.index):
-        if col.startswith("Call") and call_itm:
-            styles[i] = "background-color: #264b70; color: white;"
+CHAIN_COLUMN_CONFIG = {
+    "Strike": st.column_config.NumberColumn("Strike", format="%.2f"),
+    "Call ITM": st.column_config.CheckboxColumn("Call ITM"),
+    "Put ITM": st.column_config.CheckboxColumn("Put ITM"),
+}
 
-        if col.startswith("Put") and put_itm:
-            styles[i] = "background-color: #264b70; color: white;"
 
-        if col == "Strike":
-            styles[i] = "background-color: #333333; color: white; font-weight: bold;"
+def build_itm_styles(table):
+    """
+    CSS for every cell of the chain table, built once per chain load
+    from the Call ITM / Put ITM masks instead of a row-wise Styler pass.
+    """
+    styles = pd.DataFrame("", index=table.index, columns=table.columns)
+
+    call_itm = table["Call ITM"].fillna(False).astype(bool).to_numpy()
+    put_itm = table["Put ITM"].fillna(False).astype(bool).to_numpy()
+
+    call_cols = [col for col in table.columns if col.startswith("Call")]
+    put_cols = [col for col in table.columns if col.startswith("Put")]
+
+    styles.loc[call_itm, call_cols] = ITM_CSS
+    styles.loc[put_itm, put_cols] = ITM_CSS
+    styles["Strike"] = STRIKE_CSS
 
     return styles
 
 
+def display_option_chain(table, styles, highlight_itm):
+    """
+    Small chains: Styler with the precomputed ITM styles.
+    Large chains (or highlighting off): plain dataframe with column config,
+    plus pre-split OTM views that sellers usually look at.
+    """
+    if highlight_itm and len(table) <= STYLED_ROW_LIMIT:
+        st.dataframe(
+            table.style.apply(lambda _: styles, axis=None),
+            use_container_width=True,
+            height=800
+        )
+        return
+
+    if highlight_itm:
+        st.caption(
+            f"{len(table)} rows: showing the fast view. "
+            "Use the OTM tabs or narrow the strike range for ITM highlighting."
+        )
+
+    call_itm = table["Call ITM"].fillna(False).astype(bool)
+    put_itm = table["Put ITM"].fillna(False).astype(bool)
+
+    call_cols = [col for col in table.columns if col.startswith("Call")]
+    put_cols = [col for col in table.columns if col.startswith("Put")]
+
+    all_tab, otm_puts_tab, otm_calls_tab = st.tabs(["Full Chain", "OTM Puts", "OTM Calls"])
+
+    with all_tab:
+        st.dataframe(
+            table,
+            use_container_width=True,
+            height=800,
+            hide_index=True,
+            column_config=CHAIN_COLUMN_CONFIG
+        )
+
+    with otm_puts_tab:
+        st.dataframe(
+            table.loc[~put_itm, ["Strike"] + put_cols],
+            use_container_width=True,
+            height=600,
+            hide_index=True,
+            column_config=CHAIN_COLUMN_CONFIG
+        )
+
+    with otm_calls_tab:
+        st.dataframe(
+            table.loc[~call_itm, ["Strike"] + call_cols],
+            use_container_width=True,
+            height=600,
+            hide_index=True,
+            column_config=CHAIN_COLUMN_CONFIG
+        )
+
+
 def build_put_ladder_df(ladder_rows, total_capital, dte):
     """
     Build ladder dataframe from manual rows.
@@ -322,6 +446,31 @@ def recalc_ladder_with_contracts(ladder_df, total_capital, dte, contracts_col="C
     return df
 
 
+def ladder_df_from_optimizer_row(row, allocations, total_capital, dte):
+    """
+    Turn one optimize_put_ladder result row into a ladder dataframe
+    with the optimized contract counts.
+    """
+    ladder_df = pd.DataFrame({
+        "Leg": [i + 1 for i in range(len(allocations))],
+        "Allocation %": allocations,
+        "Strike": [row[f"Strike {i + 1}"] for i in range(len(allocations))],
+        "Premium": [row[f"Premium {i + 1}"] for i in range(len(allocations))],
+        "Contracts": [int(row[f"Contracts {i + 1}"]) for i in range(len(allocations))],
+    })
+
+    ladder_df["Allocation Weight"] = ladder_df["Allocation %"] / 100
+    ladder_df["Target Capital"] = total_capital * ladder_df["Allocation Weight"]
+    ladder_df["Collateral Per Contract"] = ladder_df["Strike"] * 100
+
+    return recalc_ladder_with_contracts(
+        ladder_df=ladder_df,
+        total_capital=total_capital,
+        dte=dte,
+        contracts_col="Contracts"
+    )
+
+
 def summarize_ladder(ladder_df, total_capital, dte):
     """
     Return basket-level summary metrics.
@@ -468,6 +617,12 @@ moneyness_range = st.sidebar.slider(
 
 show_raw_data = st.sidebar.checkbox("Show raw calls and puts", value=False)
 
+highlight_itm = st.sidebar.checkbox(
+    "Highlight ITM rows",
+    value=True,
+    help=f"Chains with more than {STYLED_ROW_LIMIT} rows always use the fast view."
+)
+
 
 # =====================================================
 # Main app
@@ -485,6 +640,28 @@ if ticker:
 
         load_button = st.sidebar.button("Load option chain")
 
+        load_all_button = st.sidebar.button(
+            "Load all expirations",
+            help="Fetch every expiration in parallel to compare CAGR across expirations."
+        )
+
+        if load_all_button:
+            with st.spinner(f"Loading {len(expirations)} expirations for {ticker}..."):
+                surface, failed_expirations = load_option_surface(ticker)
+                surface_stock_price = get_stock_price(tk)
+
+            if surface.empty:
+                st.error("No option contracts could be loaded for this ticker.")
+            else:
+                st.session_state.option_surface = add_contract_metrics(
+                    surface,
+                    stock_price=surface_stock_price,
+                    r=risk_free_rate
+                )
+                st.session_state.option_surface_failed = failed_expirations
+                st.session_state.option_surface_ticker = ticker
+                st.session_state.option_surface_stock_price = surface_stock_price
+
         if load_button:
             stock_price = get_stock_price(tk)
 
@@ -532,6 +709,8 @@ if ticker:
                 "Call Volume",
                 "Call OI",
                 "Call IV %",
+                "Call IV Mid %",
+                "Call IV Last %",
                 "Call Delta",
                 "Call Period Return %",
                 "Call CAGR %",
@@ -545,6 +724,8 @@ if ticker:
                 "Put Volume",
                 "Put OI",
                 "Put IV %",
+                "Put IV Mid %",
+                "Put IV Last %",
                 "Put Delta",
                 "Put Period Return %",
                 "Put CAGR %",
@@ -564,6 +745,8 @@ if ticker:
             # Save everything in session_state
             st.session_state.option_chain_loaded = True
             st.session_state.option_table = table
+            st.session_state.option_table_styles = build_itm_styles(table)
+            st.session_state.option_table_csv = table.to_csv(index=False).encode("utf-8")
             st.session_state.option_stock_price = stock_price
             st.session_state.option_expiration = expiration
             st.session_state.option_dte = dte
@@ -592,19 +775,15 @@ if ticker:
 
             st.subheader("Yahoo Style Option Chain")
 
-            styled_table = table.style.apply(style_itm, axis=1)
-
-            st.dataframe(
-                styled_table,
-                use_container_width=True,
-                height=800
+            display_option_chain(
+                table,
+                styles=st.session_state.option_table_styles,
+                highlight_itm=highlight_itm
             )
 
-            csv = table.to_csv(index=False).encode("utf-8")
-
             st.download_button(
                 "Download CSV",
-                data=csv,
+                data=st.session_state.option_table_csv,
                 file_name=f"{ticker_loaded}_{expiration_loaded}_options_chain.csv",
                 mime="text/csv"
             )
@@ -638,6 +817,50 @@ if ticker:
                 """
             )
 
+        # Display the all-expirations surface
+        surface = st.session_state.option_surface
+
+        if surface is not None and st.session_state.option_surface_ticker == ticker:
+            st.divider()
+            st.subheader("CAGR Across All Expirations")
+
+            if st.session_state.option_surface_failed:
+                st.warning(
+                    "Could not load expirations: "
+                    + ", ".join(st.session_state.option_surface_failed)
+                )
+
+            surface_view = surface
+
+            if filter_near_money:
+                surface_price = st.session_state.option_surface_stock_price
+                lower = surface_price * (1 - moneyness_range / 100)
+                upper = surface_price * (1 + moneyness_range / 100)
+                surface_view = surface_view[
+                    (surface_view["strike"] >= lower) &
+                    (surface_view["strike"] <= upper)
+                ]
+
+            for option_type, label in [("PUT", "Put CAGR %"), ("CALL", "Call CAGR %")]:
+                pivot = surface_view[surface_view["type"] == option_type].pivot_table(
+                    index="strike",
+                    columns="expiration",
+                    values="CAGR %"
+                ).round(2)
+
+                st.markdown(f"### {label} by Strike and Expiration")
+                st.dataframe(pivot, use_container_width=True, height=500)
+
+            surface_csv = surface.to_csv(index=False).encode("utf-8")
+
+            st.download_button(
+                "Download All Expirations CSV",
+                data=surface_csv,
+                file_name=f"{ticker}_all_expirations_options.csv",
+                mime="text/csv",
+                key="download_option_surface"
+            )
+
     except Exception as e:
         st.error(f"Error: {e}")
 
@@ -863,8 +1086,106 @@ if calculate_ladder:
         }
 
 
-# Display ladder results and allow extra contracts from unused capital
-if st.session_state.put_ladder_base_df is not None and st.session_state.put_ladder_params is not None:
+# =====================================================
+# Put Ladder Optimizer (uses the loaded chain)
+# =====================================================
+st.markdown("### 🤖 Optimize Ladder From Loaded Chain")
+
+st.write(
+    "Search every strike combination of the loaded puts for the allocation % entered above, "
+    "with contract counts around each leg's allocation (at least one per leg) "
+    "plus extra contracts from unused capital, and rank by weighted CAGR. "
+    "Only ladders with an average assignment price at or below the target are kept."
+)
+
+raw_puts = st.session_state.get("raw_puts")
+
+if raw_puts is None or loaded_option_dte is None:
+    st.info("Load an option chain first to optimize the ladder from its puts.")
+else:
+    with st.form("put_ladder_optimizer_form"):
+        opt_col1, opt_col2, opt_col3 = st.columns(3)
+
+        target_avg_price = opt_col1.number_input(
+            "Max Avg Assignment Price",
+            min_value=0.0,
+            value=round(last_price * 0.6, 2),
+            step=1.0
+        )
+
+        premium_source = opt_col2.selectbox(
+            "Premium",
+            options=["Mid", "Bid", "Last"],
+            help="Mid falls back to Last when bid/ask is missing."
+        )
+
+        max_candidates = opt_col3.number_input(
+            "Max candidate strikes",
+            min_value=4,
+            max_value=80,
+            value=40,
+            step=1,
+            help="Dense chains are thinned evenly to this many strikes."
+        )
+
+        run_optimizer = st.form_submit_button("Optimize Put Ladder")
+
+    ladder_allocations = [row["Allocation %"] for row in ladder_rows]
+
+    if run_optimizer and abs(sum(ladder_allocations) - 100) > 0.01:
+        st.error(f"Allocation must sum to 100%. Current sum: {sum(ladder_allocations):.2f}%")
+
+    elif run_optimizer:
+        if premium_source == "Mid":
+            premiums = calc_mid_price(raw_puts["bid"], raw_puts["ask"])
+            premiums = np.where(np.isnan(premiums), raw_puts["lastPrice"], premiums)
+        elif premium_source == "Bid":
+            premiums = raw_puts["bid"].to_numpy(dtype=float)
+        else:
+            premiums = raw_puts["lastPrice"].to_numpy(dtype=float)
+
+        with st.spinner("Searching ladder combinations..."):
+            optimizer_results = optimize_put_ladder(
+                strikes=raw_puts["strike"].to_numpy(dtype=float),
+                premiums=premiums,
+                stock_price=last_price,
+                allocations=ladder_allocations,
+                total_capital=ladder_total_capital,
+                dte=ladder_dte,
+                target_avg_price=target_avg_price,
+                max_candidates=int(max_candidates)
+            )
+
+        st.session_state.put_ladder_optimizer_results = optimizer_results
+
+        if optimizer_results.empty:
+            st.warning("No ladder meets the target average assignment price.")
+        else:
+            # Load the best ladder into the ladder results below
+            st.session_state.put_ladder_base_df = ladder_df_from_optimizer_row(
+                optimizer_results.iloc[0],
+                allocations=ladder_allocations,
+                total_capital=ladder_total_capital,
+                dte=ladder_dte
+            )
+            st.session_state.put_ladder_params = {
+                "total_capital": ladder_total_capital,
+                "dte": ladder_dte,
+                "structure": ladder_structure
+            }
+
+    optimizer_results = st.session_state.put_ladder_optimizer_results
+
+    if optimizer_results is not None and not optimizer_results.empty:
+        st.markdown("#### Top Ladders")
+        st.dataframe(optimizer_results.round(2), use_container_width=True)
+
+
+# Display ladder results and allow extra contracts from unused capital.
+# Runs as a fragment where supported, so editing Extra Contracts reruns
+# only this section and not the option chain above.
+@fragment
+def display_ladder_results():
     params = st.session_state.put_ladder_params
     total_capital = params["total_capital"]
     dte = params["dte"]
@@ -986,3 +1307,135 @@ if st.session_state.put_ladder_base_df is not None and st.session_state.put_ladd
         `Avg Assignment Price = sum(Strike * Actual Weight %) / sum(Actual Weight %)`
         """
     )
+
+
+if st.session_state.put_ladder_base_df is not None and st.session_state.put_ladder_params is not None:
+    display_ladder_results()
+
+# =====================================================
+# Cash-Secured Put Screener
+# =====================================================
+st.divider()
+st.subheader("🔎 Cash-Secured Put Screener")
+
+st.write(
+    "Scan a watchlist across all expirations up to a max DTE. "
+    "Chains are fetched in parallel and cached for 5 minutes per ticker and expiration. "
+    "Shows the puts with the highest CAGR inside the delta band."
+)
+
+with st.form("put_screener_form"):
+    screener_tickers_text = st.text_area(
+        "Watchlist (comma separated)",
+        value="SPY,QQQ,IWM,AAPL,MSFT,NVDA"
+    )
+
+    sc1, sc2, sc3, sc4 = st.columns(4)
+
+    screener_delta_band = sc1.slider(
+        "|Put Delta| band",
+        min_value=0.01,
+        max_value=0.99,
+        value=(0.10, 0.30),
+        step=0.01
+    )
+
+    screener_min_oi = sc2.number_input(
+        "Minimum open interest",
+        min_value=0,
+        value=100,
+        step=10
+    )
+
+    screener_max_dte = sc3.number_input(
+        "Max DTE",
+        min_value=1,
+        value=120,
+        step=1
+    )
+
+    screener_top_n = sc4.number_input(
+        "Top N",
+        min_value=1,
+        value=50,
+        step=5
+    )
+
+    run_screener = st.form_submit_button("Run Screener")
+
+if run_screener:
+    screener_tickers = [
+        t.strip().upper()
+        for t in screener_tickers_text.split(",")
+        if t.strip()
+    ]
+
+    if not screener_tickers:
+        st.error("Please enter at least one ticker.")
+    else:
+        with st.spinner(f"Loading option chains for {len(screener_tickers)} tickers..."):
+            universe, screener_failed = load_universe(
+                screener_tickers,
+                r=risk_free_rate,
+                max_dte=int(screener_max_dte),
+                load_quote=load_quote,
+                load_chain=load_chain
+            )
+
+        st.session_state.put_screener_results = screen_puts(
+            universe,
+            delta_band=screener_delta_band,
+            min_open_interest=int(screener_min_oi),
+            top_n=int(screener_top_n)
+        )
+        st.session_state.put_screener_failed = screener_failed
+
+if st.session_state.put_screener_results is not None:
+    if st.session_state.put_screener_failed:
+        st.warning(
+            "Could not load: "
+            + ", ".join(st.session_state.put_screener_failed)
+        )
+
+    screener_results = st.session_state.put_screener_results
+
+    if screener_results.empty:
+        st.info("No puts matched the delta band and open interest filters.")
+    else:
+        screener_cols = [
+            "ticker",
+            "expiration",
+            "DTE",
+            "strike",
+            "Stock Price",
+            "lastPrice",
+            "bid",
+            "ask",
+            "openInterest",
+            "IV %",
+            "IV Mid %",
+            "Delta",
+            "Period Return %",
+            "CAGR %"
+        ]
+
+        screener_display = screener_results[screener_cols].rename(columns={
+            "ticker": "Ticker",
+            "expiration": "Expiration",
+            "strike": "Strike",
+            "lastPrice": "Put Last",
+            "bid": "Put Bid",
+            "ask": "Put Ask",
+            "openInterest": "Put OI",
+            "Delta": "Put Delta"
+        }).round(2)
+
+        st.dataframe(screener_display, use_container_width=True, height=500)
+
+        st.download_button(
+            "Download Screener CSV",
+            data=screener_display.to_csv(index=False).encode("utf-8"),
+            file_name="cash_secured_put_screener.csv",
+            mime="text/csv",
+            key="download_put_screener"
+        )